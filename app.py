@@ -1,7 +1,8 @@
 import streamlit as st
 import pandas as pd
-import io
-import xlsxwriter # Required for saving images to Excel
+import os
+import tempfile
+import contextlib
 
 # --- IMPORT LOCAL MODULES ---
 from phase2_ingest import NeuralIngestor
@@ -10,6 +11,14 @@ from phase8_actions import ExecutionActionSuite
 from phase5_schema import SchemaInferenceEngine
 from phase6_materializer import DataMaterializer
 from phase9_finalize import SchemaLockMaster
+from phase10_export import ProfessionalExporter, MIME_TYPES
+from session_store import SessionStore, SessionVault
+from monitor_view import PagedView
+from instrumentation import TRACER, to_jsonl, summarize
+from command_runner import CommandRunner
+from frame_cache import FrameCache
+from chunked_frame import ChunkedFrame, ingest_file
+from snapshot_store import SessionJournal, ensure_snapshot, resume_session, snapshot_root
 
 # --- 1. PAGE CONFIGURATION ---
 st.set_page_config(
@@ -107,17 +116,39 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- 3. INITIALIZE ENGINES ---
-if 'engines_loaded' not in st.session_state:
-    st.session_state.ingestor = NeuralIngestor()
-    st.session_state.intent_engine = CognitiveIntentEngine()
-    st.session_state.action_suite = ExecutionActionSuite()
-    st.session_state.engines_loaded = True
+@st.cache_resource
+def load_engines():
+    # Built once per server process and shared by every session.
+    # JEFF_BACKEND=duckdb runs filter/sort/group/dedupe/analyze as SQL
+    return NeuralIngestor(), CognitiveIntentEngine(), ExecutionActionSuite(backend=os.environ.get("JEFF_BACKEND", "pandas"))
+
+ingestor, intent_engine, action_suite = load_engines()
 
 # --- 4. STATE MANAGEMENT ---
-if 'df' not in st.session_state: st.session_state.df = None
+@st.cache_resource
+def get_session_vault():
+    # Shared by every session in this server process
+    return SessionVault(idle_after=600)
+
+@st.cache_resource
+def get_frame_cache():
+    # Locked frames by input hash, shared read-only by every session (1 GiB budget)
+    return FrameCache(budget_bytes=1024 ** 3)
+
+if 'store' not in st.session_state:
+    # Owns the active frame + undo history; spills to disk when idle
+    st.session_state.store = get_session_vault().register(SessionStore())
 if 'chat_log' not in st.session_state: st.session_state.chat_log = []
-if 'undo_stack' not in st.session_state: st.session_state.undo_stack = []
+st.session_state.store.touch()
+get_session_vault().sweep() # Release frames of sessions nobody is using
 if 'artifacts' not in st.session_state: st.session_state.artifacts = [] # Store graphs/stats
+if 'export_cache' not in st.session_state: st.session_state.export_cache = {} # Built export bytes
+if 'export_jobs' not in st.session_state: st.session_state.export_jobs = [] # Background exports
+if 'monitor' not in st.session_state: st.session_state.monitor = PagedView(page_size=500)
+if 'trace_log' not in st.session_state: st.session_state.trace_log = [] # Timing/memory spans
+if 'commands' not in st.session_state: st.session_state.commands = CommandRunner(action_suite) # Per-session worker
+if 'last_artifact' not in st.session_state: st.session_state.last_artifact = None # Shown on the Monitor
+if 'journal' not in st.session_state: st.session_state.journal = None # Command log for resume (?resume=token)
 
 # --- 5. LOGIC FUNCTIONS ---
 def log_msg(sender, msg):
@@ -126,6 +157,58 @@ def log_msg(sender, msg):
     entry = f"**{icon} [{timestamp}] {sender}:**\n\n{msg}\n\n---"
     st.session_state.chat_log.insert(0, entry)
 
+def tracing():
+    """Collects this session's spans while the sidebar PERFORMANCE toggle is on."""
+    if not st.session_state.get("trace_on"):
+        return contextlib.nullcontext()
+    del st.session_state.trace_log[:-500] # Keep the log bounded
+    return TRACER.sink(st.session_state.trace_log, memory=st.session_state.get("trace_memory", False))
+
+def build_frame(raw_text):
+    df = ingestor.build_diagnostic_dataframe(raw_text)
+    schema = SchemaInferenceEngine().infer(df)
+    df = DataMaterializer().materialize(df, schema)
+    # Writes a snapshot, so a refresh or restart can resume via ?resume=
+    return SchemaLockMaster(snapshot_dir=snapshot_root()).lock(df, schema)
+
+def reset_for_new_data():
+    st.session_state.commands.cancel() # A running command belongs to the old data
+    st.session_state.store.clear_undo()
+    st.session_state.artifacts = [] # Reset artifacts on new load
+    st.session_state.last_artifact = None
+    st.session_state.export_cache.clear() # Old exports belong to the old data
+    for job in st.session_state.export_jobs: job.cancel()
+    st.session_state.export_jobs = []
+    st.session_state.journal = None
+    st.query_params.pop("resume", None)
+
+def start_journal(df):
+    """Starts this session's command log on top of df's snapshot and puts its token in the URL."""
+    try:
+        # A frame from the shared cache may point at a snapshot that was pruned since
+        snapshot_id = ensure_snapshot(df, snapshot_root())
+        if snapshot_id:
+            st.session_state.journal = SessionJournal(snapshot_id, root=snapshot_root())
+            st.query_params["resume"] = st.session_state.journal.token
+    except Exception as e:
+        # The session still works; it just cannot be resumed
+        log_msg("ERROR", f"Session cannot be resumed (snapshot unavailable: {e}).")
+
+def resume_from_url():
+    token = st.query_params.get("resume")
+    log_msg("JEFF", "Resuming saved session...")
+    try:
+        with tracing(), TRACER.span("app.resume") as span:
+            journal, artifacts = resume_session(token, action_suite, st.session_state.store, snapshot_root())
+            span.rows_out = len(st.session_state.store.df)
+        st.session_state.journal = journal
+        st.session_state.artifacts = artifacts
+        st.session_state.last_artifact = artifacts[-1] if artifacts else None
+        log_msg("JEFF", f"Session resumed. {len(st.session_state.store.df)} rows, {len(st.session_state.store)} commands replayed.")
+    except Exception as e:
+        st.query_params.pop("resume", None)
+        log_msg("ERROR", f"Could not resume: {e}")
+
 def ingest_data():
     raw_text = st.session_state.get("raw_input_area", "")
     if not raw_text.strip():
@@ -133,14 +216,35 @@ def ingest_data():
         return
     log_msg("JEFF", "Ingesting Data...")
     try:
-        st.session_state.undo_stack = []
-        st.session_state.artifacts = [] # Reset artifacts on new load
-        df = st.session_state.ingestor.build_diagnostic_dataframe(raw_text)
-        schema = SchemaInferenceEngine().infer(df)
-        df = DataMaterializer().materialize(df, schema)
-        df = SchemaLockMaster().lock(df, schema)
-        st.session_state.df = df
-        log_msg("JEFF", f"Data Materialized. {len(df)} rows.")
+        reset_for_new_data()
+        with tracing(), TRACER.span("app.ingest") as span:
+            # Same paste as another session: reuse its frame (commands copy before editing)
+            df, shared = get_frame_cache().get_or_build(raw_text, build_frame)
+            span.rows_out = len(df)
+        st.session_state.store.df = df
+        start_journal(df)
+        log_msg("JEFF", f"Data Materialized. {len(df)} rows." + (" (shared cache)" if shared else ""))
+        st.toast("Loaded Successfully", icon="✅")
+    except Exception as e:
+        log_msg("ERROR", str(e))
+        st.error(f"Error: {e}")
+
+def ingest_large_file():
+    path = st.session_state.get("large_file_path", "").strip()
+    if not path:
+        st.toast("Enter a file path on the server.", icon="⚠️")
+        return
+    log_msg("JEFF", f"Ingesting {path} out-of-core...")
+    try:
+        reset_for_new_data()
+        store = st.session_state.store
+        # Row groups go to the session's temp dir and are removed with it
+        target = os.path.join(store.spill_dir, f"source_{store.version + 1}.parquet")
+        with tracing(), TRACER.span("app.ingest_file") as span:
+            frame = ingest_file(path, target, ingestor)
+            span.rows_out = len(frame)
+        store.df = frame
+        log_msg("JEFF", f"Data Materialized out-of-core. {len(frame)} rows in {frame.num_row_groups} row groups.")
         st.toast("Loaded Successfully", icon="✅")
     except Exception as e:
         log_msg("ERROR", str(e))
@@ -149,41 +253,133 @@ def ingest_data():
 def run_command():
     cmd = st.session_state.get("cmd_input_box", "")
     if not cmd.strip(): return
-    if st.session_state.df is None:
+    store = st.session_state.store
+    if not store.has_data:
         st.toast("No data loaded.", icon="⚠️")
         return
     log_msg("USER", cmd)
-    intent = st.session_state.intent_engine.analyze_command(cmd, st.session_state.df.columns)
+    intent = intent_engine.analyze_command(cmd, store.df.columns)
     
     if intent["action"] == "unknown":
         log_msg("JEFF", "Unknown command.")
         return
 
-    st.session_state.undo_stack.append(st.session_state.df.copy())
-    try:
-        if intent["action"] == "dedupe" and "subset" not in intent["parameters"]:
-             intent["parameters"]["keep"] = "first"
-        
-        # [CHANGE]: Unpack 3 values now (df, msg, artifact)
-        new_df, result_msg, artifact = st.session_state.action_suite.execute(intent, st.session_state.df)
-        
-        st.session_state.df = new_df
-        
+    if intent["action"] == "dedupe" and "subset" not in intent["parameters"]:
+         intent["parameters"]["keep"] = "first"
+
+    runner = st.session_state.commands
+    if runner.current and not runner.current.collected:
+        log_msg("JEFF", f"Superseded '{runner.current.command}'.")
+    memory = st.session_state.get("trace_on") and st.session_state.get("trace_memory", False)
+    job = runner.submit(cmd, intent, store.df, store.version, memory)
+    # Quick commands finish inside the callback; slow ones continue in the background
+    if job.wait(timeout=0.5):
+        finish_command()
+    else:
+        log_msg("JEFF", f"Running '{cmd}' in background...")
+
+def finish_command():
+    """Commits the current command's result (UI thread only). Returns the job once handled."""
+    job = st.session_state.commands.collect(st.session_state.store)
+    if job is None:
+        return None
+    if st.session_state.get("trace_on"):
+        st.session_state.trace_log.extend(job.spans)
+    if job.status == "done":
+        _, result_msg, artifact = job.result
         # [CHANGE]: Store artifact if exists (for download)
         if artifact:
             st.session_state.artifacts.append(artifact)
-            
+            st.session_state.last_artifact = artifact
+        if st.session_state.journal:
+            try:
+                st.session_state.journal.record(job.command, job.intent, result_msg, artifact)
+            except OSError as e:
+                # The command itself succeeded; only resuming this session is lost
+                st.session_state.journal = None
+                st.query_params.pop("resume", None)
+                log_msg("ERROR", f"Session can no longer be resumed (journal write failed: {e}).")
         log_msg("JEFF", result_msg)
-    except Exception as e:
-        st.session_state.undo_stack.pop()
-        log_msg("ERROR", str(e))
+    elif job.status == "failed":
+        log_msg("ERROR", job.error)
+    else:
+        log_msg("JEFF", f"'{job.command}' {job.status}; data unchanged.")
+    return job
+
+def cancel_command():
+    st.session_state.commands.cancel()
+    finish_command()
+
+@st.fragment(run_every=0.5)
+def command_monitor():
+    """Shows the running command and commits it when it finishes."""
+    runner = st.session_state.commands
+    if finish_command() is not None:
+        st.rerun() # New data: redraw the whole app
+    job = runner.current
+    done = ", ".join(f"{s['name']} {s['wall_ms']:.0f}ms" for s in job.spans[-3:])
+    st.caption(f"{job.status.upper()}: '{job.command}' {job.elapsed:.1f}s" + (f" | {done}" if done else ""))
+    st.button("✖ CANCEL COMMAND", on_click=cancel_command)
 
 def undo_action():
-    if st.session_state.undo_stack:
-        st.session_state.df = st.session_state.undo_stack.pop()
+    store = st.session_state.store
+    if len(store):
+        st.session_state.commands.cancel() # Its result would be based on the undone state
+        finish_command()
+        store.df = store.pop_undo()
+        if st.session_state.journal:
+            st.session_state.journal.pop()
         log_msg("JEFF", "Undo successful.")
         st.toast("Undone", icon="⏪")
 
+def export_download(fname, fmt):
+    """
+    Returns a deferred builder for the download button. The file is only
+    generated on click and cached by (data version, artifacts, filename).
+    """
+    store = st.session_state.store
+    artifacts = list(st.session_state.artifacts)
+    cache = st.session_state.export_cache
+    key = (store.version, tuple(id(a) for a in artifacts), f"{fname}.{fmt}")
+
+    def build():
+        if key not in cache:
+            cache.clear() # Keep only the latest export per session
+            cache[key] = ProfessionalExporter().export_bytes(store.df, fmt, artifacts)
+        return cache[key]
+    return build
+
+def start_background_export(fname, fmt):
+    store = st.session_state.store
+    exporter = ProfessionalExporter()
+    # Each job gets its own folder inside the session's temp dir
+    exporter.output_directory = tempfile.mkdtemp(prefix="export_", dir=store.spill_dir)
+    job = exporter.submit(store.df, f"{fname}.{fmt}", st.session_state.artifacts)
+    st.session_state.export_jobs.append(job)
+    log_msg("JEFF", f"Export of {job.total_rows} rows started in background.")
+
+def read_export(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+@st.fragment(run_every=1.0)
+def export_monitor():
+    """Polls the latest background export without rerunning the whole app."""
+    job = st.session_state.export_jobs[-1]
+    mb = job.bytes_written / (1024 * 1024)
+    st.progress(min(job.progress, 1.0), text=f"{job.status.upper()}: {job.rows_written}/{job.total_rows} rows | {mb:.1f} MB")
+    if not job.finished:
+        st.button("✖ CANCEL EXPORT", on_click=job.cancel)
+    elif job.status == "done":
+        st.download_button("⬇️ GET FILE", data=lambda: read_export(job.path), file_name=job.filename, mime=MIME_TYPES[job.fmt])
+    elif job.status == "failed":
+        st.caption(f"Export failed: {job.error}")
+
+# Browser refresh / server restart: ?resume=<token> reloads the snapshot instead of re-ingesting
+if "resume" in st.query_params and not st.session_state.store.has_data and not st.session_state.get("resume_tried"):
+    st.session_state.resume_tried = True
+    resume_from_url()
+
 # --- 6. SIDEBAR LOG ---
 with st.sidebar:
     st.subheader("SESSION LOG")
@@ -191,6 +387,21 @@ with st.sidebar:
     for log_entry in st.session_state.chat_log:
         st.markdown(log_entry)
 
+    with st.expander("⏱ PERFORMANCE"):
+        frames = get_frame_cache()
+        st.caption(f"Frame cache: {len(frames)} frames, {frames.used_bytes / 1024 ** 2:.1f} of "
+                   f"{frames.budget_bytes / 1024 ** 2:.0f} MB | {frames.hits} hits, {frames.misses} misses")
+        st.toggle("Record spans", key="trace_on")
+        st.checkbox("Trace peak memory (slower)", key="trace_memory")
+        spans = st.session_state.trace_log
+        if spans:
+            st.dataframe(summarize(spans), width='stretch')
+            st.dataframe(pd.DataFrame(spans[-20:][::-1]).drop(columns=["start"]), width='stretch', hide_index=True)
+            st.download_button("⬇️ SPANS (.jsonl)", data=to_jsonl(spans), file_name="jeff_spans.jsonl", mime="application/jsonl")
+            st.button("CLEAR", on_click=spans.clear)
+        else:
+            st.caption("No spans recorded yet.")
+
 # --- 7. MAIN DASHBOARD ---
 st.title("🦇 JEFF DATA ANALYST")
 
@@ -206,6 +417,10 @@ with c1:
         st.text_area("Data", height=400, key="raw_input_area", placeholder="Paste Excel/CSV...", label_visibility="collapsed")
         st.markdown('</div>', unsafe_allow_html=True)
         st.button("⚡ LOAD DATA", on_click=ingest_data)
+        with st.expander("LARGE FILE (OUT-OF-CORE)"):
+            # Parsed chunk-by-chunk into Parquet; only the visible page is ever loaded
+            st.text_input("Server path", key="large_file_path", placeholder="/data/export.txt")
+            st.button("💾 LOAD FROM DISK", on_click=ingest_large_file)
 
 # === CARD 2: CONTROLS ===
 with c2:
@@ -217,42 +432,20 @@ with c2:
         
         st.button("▶ EXECUTE", on_click=run_command)
         st.button("⏪ UNDO", on_click=undo_action)
+        if st.session_state.commands.current and not st.session_state.commands.current.collected:
+            command_monitor()
         
         st.markdown("---")
         
-        if st.session_state.df is not None:
+        if st.session_state.store.has_data:
             fname = st.text_input("Filename:", value="data", label_visibility="collapsed")
-            clean_df = st.session_state.df.loc[:, ~st.session_state.df.columns.str.startswith('_')]
-            
-            # [CHANGE]: Advanced Download Logic to include Graphs/Analysis
-            buffer = io.BytesIO()
-            with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
-                # 1. Write Data
-                clean_df.to_excel(writer, index=False, sheet_name='Data')
-                
-                # 2. Write Artifacts (Plots/Stats)
-                workbook = writer.book
-                
-                # Check for Text Analysis
-                analysis_data = [a['content'] for a in st.session_state.artifacts if a['type'] == 'text']
-                if analysis_data:
-                    ws_stats = workbook.add_worksheet('Analysis')
-                    for i, text in enumerate(analysis_data):
-                        ws_stats.write(i * 10, 0, text) # Spacing out reports
-                        
-                # Check for Plots
-                plots = [a for a in st.session_state.artifacts if a['type'] == 'plot']
-                if plots:
-                    ws_plots = workbook.add_worksheet('Plots')
-                    ws_plots.write(0, 0, "Generated Visualizations")
-                    current_row = 2
-                    for p in plots:
-                        img_stream = io.BytesIO()
-                        p['content'].savefig(img_stream, format='png')
-                        ws_plots.insert_image(current_row, 1, p['filename'], {'image_data': img_stream})
-                        current_row += 25 # Move down for next image
-
-            st.download_button("⬇️ DOWNLOAD", data=buffer, file_name=f"{fname}.xlsx", mime="application/vnd.ms-excel")
+            fmt = st.selectbox("Format:", list(MIME_TYPES), label_visibility="collapsed")
+            # File is only built when the button is clicked (see export_download)
+            st.download_button("⬇️ DOWNLOAD", data=export_download(fname, fmt), file_name=f"{fname}.{fmt}", mime=MIME_TYPES[fmt])
+            # Large files: write in the background and keep working
+            st.button("🗂 BACKGROUND EXPORT", on_click=start_background_export, args=(fname, fmt))
+            if st.session_state.export_jobs:
+                export_monitor()
         else:
             st.button("⬇️ DOWNLOAD", disabled=True)
 
@@ -271,8 +464,8 @@ with c3:
             
         with t2: # CLEANING (Updated Dedupe)
             st.markdown("""
-            <div class="cmd-box"><span class="cmd-title">Fill Missing</span><span class="cmd-desc">Fix null values.</span><div class="cmd-code">Fill missing in Age with 0</div></div>
-            <div class="cmd-box"><span class="cmd-title">Replace</span><span class="cmd-desc">Find & Replace text.</span><div class="cmd-code">Replace 'NY' with 'New York'</div></div>
+            <div class="cmd-box"><span class="cmd-title">Fill Missing</span><span class="cmd-desc">Value, mean, median, mode or forward.</span><div class="cmd-code">Fill missing in Age with 0</div></div>
+            <div class="cmd-box"><span class="cmd-title">Replace</span><span class="cmd-desc">Find & Replace text (add 'regex' for patterns).</span><div class="cmd-code">Replace 'NY' with 'New York' in City</div></div>
             <div class="cmd-box"><span class="cmd-title">Dedupe</span><span class="cmd-desc">Remove duplicates (Row or Col).</span><div class="cmd-code">Dedupe by Email</div></div>
             """, unsafe_allow_html=True)
             
@@ -288,18 +481,40 @@ with c3:
             st.markdown("""
             <div class="cmd-box"><span class="cmd-title">Group/Pivot</span><span class="cmd-desc">Aggregate data.</span><div class="cmd-code">Group by City sum Sales</div></div>
             <div class="cmd-box"><span class="cmd-title">Stats</span><span class="cmd-desc">Mean, Max, Min.</span><div class="cmd-code">Analyze Salary</div></div>
-            <div class="cmd-box"><span class="cmd-title">Filter</span><span class="cmd-desc">Subset data.</span><div class="cmd-code">Filter Age > 25</div></div>
+            <div class="cmd-box"><span class="cmd-title">Sort</span><span class="cmd-desc">Order rows (add 'desc').</span><div class="cmd-code">Sort by Salary desc</div></div>
+            <div class="cmd-box"><span class="cmd-title">Filter</span><span class="cmd-desc">Subset data.</span><div class="cmd-code">Filter Age >= 25 and City in NY, LA</div></div>
             <div class="cmd-box"><span class="cmd-title">Plotting</span><span class="cmd-desc">Create Histograms/Bars.</span><div class="cmd-code">Plot Age</div></div>
             """, unsafe_allow_html=True)
 
 # === CARD 4: MONITOR ===
 with c4:
     with st.container(border=True):
-        if st.session_state.df is not None:
-            clean_view = st.session_state.df.loc[:, ~st.session_state.df.columns.str.startswith('_')]
-            rows, cols = clean_view.shape
-            st.markdown(f"<h3 style='color:#3b8ed0 !important; margin-bottom: 10px;'>ACTIVE DATA: {rows} ROWS | {cols} COLS</h3>", unsafe_allow_html=True)
-            st.dataframe(clean_view, height=750, use_container_width=True)
+        if st.session_state.store.has_data:
+            store = st.session_state.store
+            monitor = st.session_state.monitor
+            active_df = store.df
+            rows = len(active_df)
+            cols = sum(not str(c).startswith('_') for c in active_df.columns)
+            mode = " | OUT-OF-CORE" if isinstance(active_df, ChunkedFrame) else ""
+            st.markdown(f"<h3 style='color:#3b8ed0 !important; margin-bottom: 10px;'>ACTIVE DATA: {rows} ROWS | {cols} COLS{mode}</h3>", unsafe_allow_html=True)
+
+            # Only the visible page is sliced and sent to the browser
+            p1, p2 = st.columns([3, 1])
+            with p2:
+                monitor.page_size = st.selectbox("Rows/page", [100, 500, 1000, 5000], index=1, label_visibility="collapsed")
+            n_pages = monitor.page_count(active_df)
+            with p1:
+                page_no = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1, step=1)
+            # Latest analysis text / plot (the suite returns them, the app draws them)
+            artifact = st.session_state.last_artifact
+            if artifact:
+                with st.expander(f"LAST RESULT: {artifact['filename']}", expanded=True):
+                    if artifact['type'] == 'plot':
+                        st.image(artifact['content'])
+                    else:
+                        st.text(artifact['content'])
+            page_df = monitor.page(active_df, page_no - 1, store.version)
+            st.dataframe(page_df, height=750, use_container_width=True)
         else:
             st.markdown("### MONITOR")
             st.info("WAITING FOR SIGNAL...")
@@ -0,0 +1,188 @@
+"""
+JEFF v7.2: HEADLESS BATCH RUNNER
+--------------------------------
+Role: Unattended Pipeline Runs over Many Files
+
+Usage:
+    python batch_runner.py INPUT [INPUT ...] --script commands.txt
+                           [--out DIR] [--format xlsx|csv|parquet|feather]
+                           [--repair fill|drop|keep] [--workers N] [--overwrite] [--trace]
+                           [--backend pandas|duckdb]
+
+Each INPUT is a file, a directory (its files, non-recursive) or a glob
+("data/**/*.txt"). Every file goes through ingest -> schema ->
+materialize -> validate -> lock with a fixed repair policy instead of
+the validator's prompt, then runs the command script (one command per
+line, '#' comments) and is written by ProfessionalExporter. Files are
+spread over a process pool, one worker per core by default.
+
+Per file, DIR gets the export, a .log with the pipeline's console output
+and, for formats without sheets, the analysis/plot artifacts. A
+batch_report.json summarizes the run; the exit code is 1 if any file failed.
+--trace also writes every phase/action span to DIR/trace.jsonl.
+--backend duckdb runs filter/sort/group/dedupe/analyze through DuckDB.
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from phase10_export import FORMATS
+from instrumentation import TRACER, to_jsonl
+
+_WORKER = None # Per-process engines, built once by _init_worker()
+
+def _init_worker(repair_policy, backend="pandas"):
+    from phase2_ingest import NeuralIngestor
+    from phase3_intent import CognitiveIntentEngine
+    from phase8_actions import ExecutionActionSuite
+
+    global _WORKER
+    _WORKER = (NeuralIngestor(), CognitiveIntentEngine(), ExecutionActionSuite(backend=backend), repair_policy)
+
+def expand_inputs(patterns):
+    """
+    Resolves files, directories and globs into a sorted, de-duplicated list.
+    """
+    found = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            found += [os.path.join(pattern, name) for name in os.listdir(pattern) if not name.startswith('.')]
+        elif os.path.isfile(pattern):
+            found.append(pattern)
+        else:
+            found += glob.glob(pattern, recursive=True)
+    return sorted({os.path.abspath(p) for p in found if os.path.isfile(p)})
+
+def read_script(path):
+    with open(path, encoding='utf-8') as f:
+        lines = [line.strip() for line in f]
+    return [line for line in lines if line and not line.startswith('#')]
+
+def process_file(path, commands, out_dir, fmt, overwrite, trace=False):
+    """
+    Runs one input through the full pipeline in the current worker.
+    Returns a JSON-ready result dict; never raises.
+    """
+    from phase4_orchestrator import AnalysisOrchestrator
+    from phase10_export import ProfessionalExporter
+
+    ingestor, intent_engine, action_suite, repair_policy = _WORKER
+    stem = os.path.splitext(os.path.basename(path))[0]
+    filename = f"{stem}.{fmt}"
+    result = {"input": path, "output": os.path.join(out_dir, filename), "status": "failed", "rows": 0}
+    t0 = time.perf_counter()
+    console = io.StringIO()
+    spans = []
+
+    try:
+        with contextlib.redirect_stdout(console), TRACER.sink(spans, memory=True) if trace else contextlib.nullcontext():
+            with open(path, encoding='utf-8', errors='replace') as f:
+                raw_text = f.read()
+
+            jeff = AnalysisOrchestrator(ingestor, intent_engine, action_suite, repair_policy=repair_policy)
+            jeff.load_text(raw_text)
+            messages, artifacts = jeff.run_script(commands)
+            result["messages"] = messages
+            result["rows"] = len(jeff.df)
+
+            exporter = ProfessionalExporter()
+            exporter.output_directory = out_dir
+            if overwrite and os.path.exists(result["output"]):
+                os.remove(result["output"])
+            status = exporter.save(jeff.df, filename, artifacts if fmt == 'xlsx' else ())
+            if status == "FILE_EXISTS":
+                result["status"] = "skipped"
+                result["error"] = "Output exists (use --overwrite)."
+            elif not status.startswith("✅"):
+                result["error"] = status
+            else:
+                result["status"] = "done"
+                if fmt != 'xlsx':
+                    # CSV/Parquet/Feather have no sheets: artifacts go next to the export
+                    for artifact in artifacts:
+                        mode = 'wb' if isinstance(artifact['content'], bytes) else 'w'
+                        with open(os.path.join(out_dir, f"{stem}_{artifact['filename']}"), mode) as f:
+                            f.write(artifact['content'])
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+
+    result["seconds"] = round(time.perf_counter() - t0, 3)
+    if trace:
+        result["spans"] = [{"input": path, **span} for span in spans]
+    with open(os.path.join(out_dir, f"{stem}.log"), 'w', encoding='utf-8') as f:
+        f.write(console.getvalue())
+    return result
+
+def run_batch(paths, commands, out_dir, fmt='xlsx', repair_policy='keep', workers=None, overwrite=False, trace=False,
+              backend='pandas'):
+    """
+    Processes every path and returns the result dicts in input order.
+    workers=1 runs in this process (no pool), which is easier to debug.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) == 1:
+        _init_worker(repair_policy, backend)
+        return [process_file(p, commands, out_dir, fmt, overwrite, trace) for p in paths]
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths)),
+                             initializer=_init_worker, initargs=(repair_policy, backend)) as pool:
+        futures = {pool.submit(process_file, p, commands, out_dir, fmt, overwrite, trace): p for p in paths}
+        for future in as_completed(futures):
+            result = future.result()
+            results[futures[future]] = result
+            icon = {"done": "✅", "skipped": "⏭️"}.get(result["status"], "❌")
+            print(f"{icon} {os.path.basename(result['input'])}: {result['rows']} rows in {result['seconds']}s")
+    return [results[p] for p in paths]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JEFF headless batch runner")
+    parser.add_argument("inputs", nargs="+", help="Files, directories or glob patterns")
+    parser.add_argument("--script", required=True, help="Command script, one command per line")
+    parser.add_argument("--out", default="jeff_output")
+    parser.add_argument("--format", default="xlsx", choices=sorted(set(FORMATS.values())))
+    parser.add_argument("--repair", default="keep", choices=["fill", "drop", "keep"])
+    parser.add_argument("--workers", type=int, default=None, help="Default: one per CPU core")
+    parser.add_argument("--overwrite", action="store_true")
+    parser.add_argument("--trace", action="store_true", help="Write per-phase spans to trace.jsonl")
+    parser.add_argument("--backend", default="pandas", choices=["pandas", "duckdb"])
+    args = parser.parse_args(argv)
+
+    paths = expand_inputs(args.inputs)
+    if not paths:
+        print("❌ No input files found.")
+        return 1
+    commands = read_script(args.script)
+
+    print(f"🤖 JEFF BATCH: {len(paths)} files, {len(commands)} commands, repair='{args.repair}'")
+    t0 = time.perf_counter()
+    results = run_batch(paths, commands, args.out, args.format, args.repair, args.workers, args.overwrite, args.trace,
+                        args.backend)
+    elapsed = time.perf_counter() - t0
+
+    if args.trace:
+        with open(os.path.join(args.out, "trace.jsonl"), "w") as f:
+            f.write(to_jsonl(span for r in results for span in r.pop("spans", [])))
+    with open(os.path.join(args.out, "batch_report.json"), "w") as f:
+        json.dump(results, f, indent=2, default=str)
+
+    failed = [r for r in results if r["status"] == "failed"]
+    print(f"\n{'FILE':<32} | {'STATUS':<8} | {'ROWS':>8} | SECONDS")
+    print("-" * 64)
+    for r in results:
+        print(f"{os.path.basename(r['input'])[:32]:<32} | {r['status']:<8} | {r['rows']:>8} | {r['seconds']}")
+        if r.get("error"):
+            print(f"    ⚠️ {r['error']}")
+    print(f"\n📊 {len(results) - len(failed)}/{len(results)} files in {elapsed:.1f}s")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
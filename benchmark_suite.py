@@ -0,0 +1,601 @@
+"""
+JEFF v6.5: BENCHMARK SUITE
+--------------------------
+Role: Performance Tracking
+
+Usage:
+    python benchmark_suite.py startup [--runs 5] [--baseline FILE] [--save FILE]
+    python benchmark_suite.py cleaning [--cells 10000000]
+    python benchmark_suite.py pipeline [--sizes 1k 100k 1M 10M] [--no-memory]
+    python benchmark_suite.py backends [--sizes 1k 100k 1M]
+    python benchmark_suite.py parity [--sizes 1k 100k]
+    python benchmark_suite.py columns [--sizes 10k 100k] [--width 40]
+
+'startup' imports each JEFF module in a fresh interpreter and reports
+the median import latency, so heavy dependencies creeping back into
+module load show up as a regression against the stored baseline.
+'cleaning' times the fill/replace/rename actions on a frame with
+--cells cells (10 columns, half numeric, half text, ~10% nulls).
+'pipeline' generates messy pasted text (labeled fields, quoted names,
+number words, ragged rows, mixed delimiters, duplicate lines) with a
+fixed seed and times every stage on it separately: ingest, schema
+inference, materialize, validate, lock, each action and each export
+format. Per stage it reports median ms, rows/s and peak traced memory;
+the default sizes stop at 100k, pass --sizes 1k 100k 1M 10M for the
+full ladder.
+'backends' times filter/sort/group/dedupe/analyze on the same frames
+with the pandas and the DuckDB backend (see sql_backend.py).
+'parity' runs a battery of those actions on both backends and fails if
+any result differs; it needs duckdb installed. It also checks the
+streamed (out-of-core) dedupe against drop_duplicates on a file with a
+row group that only repeats earlier rows.
+'columns' builds a --width column paste and times the per-column phases
+(materialize, validate, profile, fingerprint, sketches) serially, on
+the column thread pool and with pure-Python parts on processes (see
+column_parallel.py).
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Everything app.py pulls in at start-up, plus the full set together
+STARTUP_MODULES = [
+    "phase2_ingest",
+    "phase3_intent",
+    "phase5_schema",
+    "phase6_materializer",
+    "phase8_actions",
+    "phase9_finalize",
+    "phase10_export",
+    "session_store",
+    "monitor_view",
+    "data_versions",
+    "plot_engine",
+    "profiler",
+    "sketches",
+    "filter_expr",
+    "instrumentation",
+    "command_runner",
+    "frame_cache",
+    "chunked_frame",
+    "sql_backend",
+    "column_parallel",
+]
+
+
+def time_import(statement, runs):
+    """
+    Median wall time (ms) spent executing `statement` in a fresh
+    interpreter (interpreter start-up itself is not counted).
+    """
+    probe = (
+        "import time; t0 = time.perf_counter(); {stmt}; "
+        "print((time.perf_counter() - t0) * 1000)"
+    )
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", probe.format(stmt=statement)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        )
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+
+def bench_startup(runs):
+    results = {}
+    for module in STARTUP_MODULES:
+        results[f"import:{module}"] = time_import(f"import {module}", runs)
+    results["import:all"] = time_import("import " + ", ".join(STARTUP_MODULES), runs)
+    return results
+
+
+def time_action(suite, intent, df, runs):
+    """
+    Median wall time (ms) of one ExecutionActionSuite action; every run
+    gets its own copy of df so in-place actions start from the same data.
+    """
+    samples = []
+    for _ in range(runs):
+        frame = df.copy()
+        t0 = time.perf_counter()
+        suite.execute(intent, frame)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def make_cleaning_frame(cells, cols=10, null_share=0.1, seed=7):
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    rows = cells // cols
+    cities = np.array(["NY", "LA", "SF", "Chicago", "Boston"], dtype=object)
+    data = {}
+    for i in range(cols):
+        if i % 2 == 0:
+            values = rng.normal(50000, 15000, rows)
+            values[rng.random(rows) < null_share] = np.nan
+        else:
+            values = cities[rng.integers(0, len(cities), rows)]
+            values[rng.random(rows) < null_share] = None
+        data[f"col_{i}"] = values
+    return pd.DataFrame(data)
+
+
+def bench_cleaning(runs, cells):
+    from phase8_actions import ExecutionActionSuite
+
+    suite = ExecutionActionSuite()
+    df = make_cleaning_frame(cells)
+    text_cols = list(df.columns[1::2])
+    intents = {
+        "fill:constant": {"columns": [], "value": "0"},
+        "fill:mean": {"columns": [], "strategy": "mean"},
+        "fill:median": {"columns": [], "strategy": "median"},
+        "fill:mode": {"columns": [], "strategy": "mode"},
+        "fill:ffill": {"columns": [], "strategy": "ffill"},
+        "replace:mapping": {"columns": text_cols, "mapping": {"NY": "New York", "LA": "Los Angeles"}, "regex": False},
+        "replace:regex": {"columns": text_cols, "mapping": {r"^S.*": "South"}, "regex": True},
+        "rename": {"mapping": {c: c.upper() for c in df.columns}},
+    }
+
+    results = {}
+    for key, params in intents.items():
+        action = key.split(":")[0]
+        results[f"{key}@{cells // 1_000_000}M_cells"] = time_action(
+            suite, {"action": action, "parameters": dict(params)}, df, runs)
+    return results
+
+
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1M": 1_000_000, "10M": 10_000_000}
+
+def make_messy_text(lines, seed=11):
+    """
+    Deterministic JEFF-style paste: 'ID: 7 | Name: "Ann Lee"; Total: ninety-two ...'
+    with dropped fields (ragged rows), mixed delimiters, number words,
+    'k' suffixes, junk tokens and ~2% repeated lines.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    first = np.array(["John", "Ann", "Bob", "Maria", "Wei", "Priya", "Omar", "Lena"], dtype=object)
+    last = np.array(["Smith", "Lee", "Kowalski", "Garcia", "Chen", "Patel", "Haddad", "Berg"], dtype=object)
+    number_words = np.array(["ninety-two", "forty", "seven", "twelve", "three hundred", "sixty-five"], dtype=object)
+    cities = np.array(["Boston", "Chicago", "Denver", "Austin", "Seattle"], dtype=object)
+    delims = np.array([" ", ", ", "; ", " | ", "\t", " ,  "], dtype=object)
+
+    def pick(options):
+        return options[rng.integers(0, len(options), lines)]
+
+    def drop(values, share):
+        values[rng.random(lines) < share] = ""
+        return values
+
+    amounts = rng.integers(10, 99_999, lines).astype(str).astype(object)
+    spelled = rng.random(lines)
+    amounts[spelled < 0.3] = pick(number_words)[spelled < 0.3]
+    amounts[(spelled >= 0.3) & (spelled < 0.4)] = (rng.integers(1, 90, lines).astype(str).astype(object) + "k")[(spelled >= 0.3) & (spelled < 0.4)]
+
+    fields = [
+        "ID: " + np.arange(1, lines + 1).astype(str).astype(object),
+        drop('Name: "' + pick(first) + " " + pick(last) + '"', 0.08),
+        "Total: " + amounts,
+        drop("Qty: " + rng.integers(1, 50, lines).astype(str).astype(object), 0.15),
+        drop(pick(cities), 0.10),
+        drop(pick(np.array(["N/A", "??", "-", "tbd"], dtype=object)), 0.97),
+    ]
+    out = [d.join(f for f in parts if f) for d, *parts in zip(pick(delims), *fields)]
+    for i in np.nonzero(rng.random(lines) < 0.02)[0]:
+        if i:
+            out[i] = out[i - 1]
+    return "\n".join(out)
+
+def make_wide_text(lines, width=40, seed=13):
+    """Deterministic ' | '-delimited paste of width columns, alternating numbers and words."""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    words = np.array(["alpha", "beta", "gamma", "delta", "omega", "sigma"], dtype=object)
+    cols = [
+        words[rng.integers(0, len(words), lines)] if i % 2 else rng.integers(0, 10**6, lines).astype(str).astype(object)
+        for i in range(width)
+    ]
+    return "\n".join(" | ".join(row) for row in zip(*cols))
+
+def measure(fn, runs, setup=None, memory=True):
+    """
+    Median wall time (ms) of fn(*setup()) and, if memory, its peak traced
+    allocation (MB) from one extra run. setup() runs outside the timer.
+    Console output of the phases is swallowed.
+    """
+    samples = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(runs):
+            args = setup() if setup else ()
+            t0 = time.perf_counter()
+            fn(*args)
+            samples.append((time.perf_counter() - t0) * 1000)
+        peak = None
+        if memory:
+            args = setup() if setup else ()
+            tracemalloc.start()
+            try:
+                fn(*args)
+                peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            finally:
+                tracemalloc.stop()
+    return statistics.median(samples), peak
+
+def build_locked_frame(text):
+    """Phases 2 -> 5 -> 6 -> 9 on text. Returns (diagnostic frame, schema, locked frame)."""
+    from phase2_ingest import NeuralIngestor
+    from phase5_schema import SchemaInferenceEngine
+    from phase6_materializer import DataMaterializer
+    from phase9_finalize import SchemaLockMaster
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        diag = NeuralIngestor().build_diagnostic_dataframe(text)
+        schema = SchemaInferenceEngine().infer(diag)
+        df = SchemaLockMaster().lock(DataMaterializer().materialize(diag, schema), schema)
+    return diag, schema, df
+
+def bench_pipeline(runs, sizes, memory=True):
+    from phase2_ingest import NeuralIngestor
+    from phase5_schema import SchemaInferenceEngine
+    from phase6_materializer import DataMaterializer
+    from phase7_validation import DataIntegrityValidator
+    from phase8_actions import ExecutionActionSuite
+    from phase9_finalize import SchemaLockMaster
+    from phase10_export import ProfessionalExporter
+    from data_versions import touch_columns
+    from filter_expr import parse_filter
+
+    results = {}
+
+    def record(stage, label, rows, ms, peak):
+        key = f"{stage}@{label}"
+        results[key] = ms
+        results[f"rows_per_s:{key}"] = rows / (ms / 1000) if ms else 0.0
+        if peak is not None:
+            results[f"peak_mb:{key}"] = peak
+
+    for label in sizes:
+        lines = SIZES[label]
+        text = make_messy_text(lines)
+        print(f"⏱ {label} lines ({len(text) / 1e6:.1f} MB of text)", file=sys.stderr)
+
+        # --- PHASES (each one measured on the previous phase's output) ---
+        diag, schema, df = build_locked_frame(text)
+
+        phases = {
+            "phase2.ingest": (lambda: NeuralIngestor().build_diagnostic_dataframe(text), None),
+            "phase5.infer": (lambda: SchemaInferenceEngine().infer(diag), None),
+            "phase6.materialize": (lambda: DataMaterializer().materialize(diag, schema), None),
+            "phase7.validate": (lambda frame: DataIntegrityValidator("keep").validate(frame), lambda: (df.copy(),)),
+            "phase9.lock": (lambda frame: SchemaLockMaster().lock(frame, schema), lambda: (df.copy(),)),
+        }
+        for stage, (fn, setup) in phases.items():
+            record(stage, label, lines, *measure(fn, runs, setup, memory))
+
+        # --- ACTIONS (fresh version tokens per run, so caches start cold) ---
+        visible = [c for c in df.columns if not str(c).startswith('_')]
+        num = next(c for c in visible if c.startswith("num_col"))
+        text_col = next(c for c in visible if c.startswith("text_col"))
+        intents = {
+            "add_col": {"column": "Bench"},
+            "add_row": {"index": -1},
+            "update": {"row_index": 0, "column": num, "value": "1"},
+            "fill": {"columns": [], "strategy": "median"},
+            "replace": {"columns": [text_col], "mapping": {"Boston": "BOS"}, "regex": False},
+            "rename": {"mapping": {num: "Renamed"}},
+            "dedupe": {},
+            "filter": {"expression": parse_filter(f"{num} >= 100 and {text_col} contains o", visible)},
+            "sort": {"column": num},
+            "group": {"by": [text_col], "agg": "sum", "value": num},
+            "delete_row": {"index": 0},
+            "delete_col": {"column": num},
+            "analyze": {"columns": []},
+            "plot": {"column": num},
+        }
+
+        def fresh_frame():
+            frame = df.copy()
+            touch_columns(frame)
+            return (ExecutionActionSuite(), frame)
+
+        for action, params in intents.items():
+            run = lambda suite, frame, a=action, p=params: suite.execute({"action": a, "parameters": dict(p)}, frame)
+            record(f"action.{action}", label, lines, *measure(run, runs, fresh_frame, memory))
+
+        # --- EXPORT (streamed to a temp file per format) ---
+        with tempfile.TemporaryDirectory() as tmp:
+            for fmt in ("xlsx", "csv", "parquet", "feather"):
+                path = os.path.join(tmp, f"bench.{fmt}")
+                export = lambda f=fmt, p=path: ProfessionalExporter().stream(df, p, f)
+                record(f"export.{fmt}", label, lines, *measure(export, runs, None, memory))
+
+    return results
+
+def backend_intents(df):
+    """
+    filter/sort/group/dedupe/analyze intents covering numeric, text and
+    mixed predicates on a locked messy frame. Returns {label: intent}.
+    """
+    from filter_expr import parse_filter
+
+    visible = [c for c in df.columns if not str(c).startswith('_')]
+    nums = [c for c in visible if c.startswith("num_col")]
+    texts = [c for c in visible if c.startswith("text_col")]
+    num, text_col = nums[0], texts[0]
+    filters = [
+        f"{num} > 5000",
+        f"{num} != 3",
+        f"{num} between 10 and 20000",
+        f"{num} in 1, 2, 3",
+        f"not ({num} < 100 or {text_col} contains 'ee')",
+        f"{text_col} contains o and {num} >= 100",
+        f"{text_col} starts with j or {text_col} ends with 'lee'",
+        f"{text_col} == 'ann lee'",
+        f"{text_col} != 'ann lee'",
+        f"{text_col} in Boston, Denver",
+        f"{num} contains 12",
+    ]
+    intents = {f"filter:{expr}": {"action": "filter", "parameters": {"expression": parse_filter(expr, visible)}}
+               for expr in filters}
+    for col in visible:
+        for asc in (True, False):
+            intents[f"sort:{col}:{'asc' if asc else 'desc'}"] = {"action": "sort", "parameters": {"column": col, "ascending": asc}}
+    for agg in ("count", "sum", "mean", "min", "max"):
+        for value in (nums[-1], texts[-1]):
+            intents[f"group:{text_col}:{agg}:{value}"] = {
+                "action": "group", "parameters": {"by": [text_col], "agg": agg, "value": value}}
+    intents[f"group:{texts[-1]},{nums[-1]}:count"] = {
+        "action": "group", "parameters": {"by": [texts[-1], nums[-1]], "agg": "count", "value": None}}
+    intents["dedupe"] = {"action": "dedupe", "parameters": {}}
+    for col in visible:
+        intents[f"dedupe:{col}"] = {"action": "dedupe", "parameters": {"column": col}}
+    intents["analyze"] = {"action": "analyze", "parameters": {"columns": []}}
+    return intents
+
+def _same_profiles(a, b):
+    # 'top' can differ on ties; its count and everything else must match
+    for col in a:
+        for key, value in a[col].items():
+            if key in ("top", "top_values", "m2"):
+                continue
+            other = b[col].get(key)
+            if isinstance(value, str) or isinstance(other, str):
+                if value != other:
+                    return f"{col}.{key}: {value!r} != {other!r}"
+            elif not (_isna(value) and _isna(other)) and not math.isclose(value, other, rel_tol=1e-9, abs_tol=1e-9):
+                return f"{col}.{key}: {value!r} != {other!r}"
+    return None
+
+def _isna(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+def check_parity(sizes):
+    """
+    Runs backend_intents on both backends. Returns the failing labels.
+    """
+    import pandas as pd
+    from phase8_actions import ExecutionActionSuite
+    from data_versions import touch_columns
+
+    failures = []
+    sql_suite = ExecutionActionSuite(backend="duckdb")
+    if sql_suite.sql is None:
+        print("❌ duckdb is not installed; nothing to compare.")
+        return ["duckdb missing"]
+
+    for label in sizes:
+        _, _, df = build_locked_frame(make_messy_text(SIZES[label]))
+        for name, intent in backend_intents(df).items():
+            results = []
+            for suite in (ExecutionActionSuite(), sql_suite):
+                frame = df.copy()
+                touch_columns(frame) # Cold caches: the profiler must not answer from the other backend's run
+                if intent["action"] == "analyze":
+                    results.append(suite.profiler.profile(frame, None, compute=suite._sql_profiles if suite.sql else None))
+                else:
+                    results.append(suite.execute(intent, frame)[:2])
+            if intent["action"] == "analyze":
+                problem = _same_profiles(*results)
+            else:
+                (a, msg_a), (b, msg_b) = results
+                problem = None if msg_a == msg_b else f"{msg_a!r} != {msg_b!r}"
+                # Hidden columns are caches (the pandas dedupe adds row hashes); compare what users see
+                visible = [c for c in a.columns if not str(c).startswith('_')]
+                try:
+                    pd.testing.assert_frame_equal(a[visible], b[visible], check_dtype=intent["action"] != "group")
+                except AssertionError as e:
+                    problem = problem or str(e).splitlines()[0]
+            print(f"{'✅' if problem is None else '❌'} {name}@{label}" + (f"\n    {problem}" if problem else ""))
+            if problem:
+                failures.append(f"{name}@{label}")
+    return failures
+
+def check_chunked_parity(sizes):
+    """
+    Streams dedupe over a ChunkedFrame whose middle row group only repeats
+    the first and compares it with drop_duplicates on the whole frame.
+    Returns the failing labels.
+    """
+    import pandas as pd
+    from chunked_frame import dedupe_chunks, write_chunks
+
+    failures = []
+    for label in sizes:
+        _, _, df = build_locked_frame(make_messy_text(SIZES[label]))
+        visible = [c for c in df.columns if not str(c).startswith('_')]
+        half = len(df) // 2
+        parts = [df[visible].iloc[:half], df[visible].iloc[:half], df[visible].iloc[half:]]
+        whole = pd.concat(parts, ignore_index=True)
+        with tempfile.TemporaryDirectory() as tmp:
+            frame = write_chunks(parts, os.path.join(tmp, "repeats.parquet"))
+            for name, subset in (("dedupe:all", None), ("dedupe:subset", visible[:1])):
+                problem = None
+                try:
+                    got = dedupe_chunks(frame, subset).to_pandas()
+                    expected = whole.drop_duplicates(subset=subset).reset_index(drop=True)
+                    pd.testing.assert_frame_equal(got, expected, check_dtype=False)
+                except Exception as e:
+                    problem = f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}"
+                print(f"{'✅' if problem is None else '❌'} chunked.{name}@{label}" + (f"\n    {problem}" if problem else ""))
+                if problem:
+                    failures.append(f"chunked.{name}@{label}")
+    return failures
+
+def bench_backends(runs, sizes):
+    from phase8_actions import ExecutionActionSuite
+    from data_versions import touch_columns
+
+    results = {}
+    suites = {"pandas": ExecutionActionSuite(), "duckdb": ExecutionActionSuite(backend="duckdb")}
+    if suites["duckdb"].sql is None:
+        del suites["duckdb"]
+
+    for label in sizes:
+        lines = SIZES[label]
+        _, _, df = build_locked_frame(make_messy_text(lines))
+        print(f"⏱ {label} lines", file=sys.stderr)
+        intents = backend_intents(df)
+        # One representative per action keeps the run short
+        picked = {}
+        for name, intent in intents.items():
+            picked.setdefault(intent["action"], intent)
+
+        for backend, suite in suites.items():
+            def fresh_frame():
+                frame = df.copy()
+                touch_columns(frame)
+                return (frame,)
+            for action, intent in picked.items():
+                run = lambda frame, s=suite, i=intent: s.execute(i, frame)
+                ms, _ = measure(run, runs, fresh_frame, memory=False)
+                key = f"{backend}.{action}@{label}"
+                results[key] = ms
+                results[f"rows_per_s:{key}"] = lines / (ms / 1000) if ms else 0.0
+    return results
+
+def bench_columns(runs, sizes, width):
+    from column_parallel import ColumnExecutor
+    from phase6_materializer import DataMaterializer
+    from phase7_validation import DataIntegrityValidator
+    from profiler import StatProfiler, fingerprint_columns
+    from sketches import build_sketches
+
+    workers = max(os.cpu_count() or 1, 2) # Still exercises the pools on one core
+    executors = {
+        "serial": ColumnExecutor(workers=1),
+        "thread": ColumnExecutor(workers=workers, mode="thread"),
+        "process": ColumnExecutor(workers=workers, mode="process"),
+    }
+
+    results = {}
+    for label in sizes:
+        lines = SIZES[label]
+        diag, schema, df = build_locked_frame(make_wide_text(lines, width))
+        cols = [c for c in df.columns if not str(c).startswith('_')]
+        print(f"⏱ {label} lines x {len(cols)} columns", file=sys.stderr)
+        for mode, ex in executors.items():
+            stages = {
+                "materialize": (lambda: DataMaterializer(executor=ex).materialize(diag, schema), None),
+                "validate": (lambda frame: DataIntegrityValidator("keep", executor=ex).validate(frame), lambda: (df.copy(),)),
+                "profile": (lambda: StatProfiler(executor=ex).profile(df), None),
+                "fingerprint": (lambda: fingerprint_columns(df, cols, executor=ex), None),
+                "sketches": (lambda: build_sketches(df, cols, executor=ex), None),
+            }
+            for stage, (fn, setup) in stages.items():
+                ms, _ = measure(fn, runs, setup, memory=False)
+                key = f"{mode}.{stage}@{label}"
+                results[key] = ms
+                results[f"rows_per_s:{key}"] = lines / (ms / 1000) if ms else 0.0
+    return results
+
+def compare(results, baseline_path, tolerance=0.25):
+    """
+    Prints each metric next to the baseline. Returns the regressed keys
+    (more than `tolerance` slower or bigger than baseline). rows/s is
+    derived from ms, so it is not compared separately.
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    regressions = []
+    print(f"\n{'METRIC':<32} | {'BASELINE':>10} | {'NOW':>10} | CHANGE")
+    print("-" * 68)
+    for key, value in results.items():
+        if key not in baseline or key.startswith("rows_per_s:"):
+            continue
+        change = (value - baseline[key]) / baseline[key] if baseline[key] else 0.0
+        flag = "  ⚠️" if change > tolerance else ""
+        print(f"{key:<32} | {baseline[key]:>10.1f} | {value:>10.1f} | {change:+.0%}{flag}")
+        if change > tolerance:
+            regressions.append(key)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JEFF benchmark suite")
+    parser.add_argument("suite", choices=["startup", "cleaning", "pipeline", "backends", "parity", "columns"])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--cells", type=int, default=10_000_000)
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=["1k", "100k"])
+    parser.add_argument("--width", type=int, default=40, help="Columns of the 'columns' suite paste")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc run per stage")
+    parser.add_argument("--baseline", help="JSON file to compare against")
+    parser.add_argument("--save", help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    if args.suite == "parity":
+        failures = check_parity(args.sizes) + check_chunked_parity(args.sizes)
+        print(f"\n{'❌' if failures else '✅'} {len(failures)} parity failures")
+        return 1 if failures else 0
+
+    if args.suite == "startup":
+        results = bench_startup(args.runs)
+    elif args.suite == "cleaning":
+        results = bench_cleaning(args.runs, args.cells)
+    elif args.suite == "backends":
+        results = bench_backends(args.runs, args.sizes)
+    elif args.suite == "columns":
+        results = bench_columns(args.runs, args.sizes, args.width)
+    else:
+        results = bench_pipeline(args.runs, args.sizes, memory=not args.no_memory)
+
+    # Plain keys are ms; 'rows_per_s:' and 'peak_mb:' keys are shown next to them
+    print(f"{'METRIC':<32} | {'MS':>10} | {'ROWS/S':>12} | {'PEAK MB':>8}")
+    print("-" * 72)
+    for key, value in results.items():
+        if key.startswith(("rows_per_s:", "peak_mb:")):
+            continue
+        rate = results.get(f"rows_per_s:{key}")
+        peak = results.get(f"peak_mb:{key}")
+        print(f"{key:<32} | {value:>10.1f} | {'' if rate is None else f'{rate:,.0f}':>12} | "
+              f"{'' if peak is None else f'{peak:.1f}':>8}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline and compare(results, args.baseline):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
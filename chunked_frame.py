@@ -0,0 +1,278 @@
+"""
+JEFF v7.6: CHUNKED FRAME (OUT-OF-CORE MODE)
+-------------------------------------------
+Role: Datasets Larger than RAM
+
+A ChunkedFrame is a Parquet file of user-facing columns written one row
+group per chunk. It stands in for the active DataFrame: len(), columns,
+attrs (version tokens), head/tail/slice for bounded previews, and
+iter_chunks() for everything else. It is never modified; operations
+stream it chunk by chunk into a new file.
+
+Streaming operations used by ExecutionActionSuite:
+  - filter_chunks: expression mask per chunk
+  - dedupe_chunks: first occurrence by 64-bit row hash, across chunks.
+    Probabilistic: matches are not confirmed by value (that would need
+    every distinct row in memory), so a hash collision drops a distinct
+    row. The in-memory dedupe (row_hashes) is exact.
+  - group_partial / group_combine / group_finish: mergeable count, sum,
+    min and max per group (mean = sum / count); the grouped result is
+    small and comes back as an in-memory DataFrame
+analyze and plot use the mergeable sketches built during materialization
+(see sketches.py); ProfessionalExporter streams row groups directly.
+"""
+
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from data_versions import touch_columns
+
+class ChunkedFrame:
+    def __init__(self, path, attrs=None, columns=None):
+        import pyarrow.parquet as pq
+
+        self.path = path
+        self._file = pq.ParquetFile(path)
+        names = self._file.schema_arrow.names
+        self.columns = list(columns) if columns is not None else names
+        self.attrs = attrs if attrs is not None else {}
+
+    def __len__(self):
+        return self._file.metadata.num_rows
+
+    def __getitem__(self, cols):
+        if isinstance(cols, str):
+            raise TypeError("Select columns of a ChunkedFrame with a list.")
+        return ChunkedFrame(self.path, self.attrs, cols)
+
+    @property
+    def empty(self):
+        return len(self) == 0 or not self.columns
+
+    @property
+    def num_row_groups(self):
+        return self._file.num_row_groups
+
+    def copy(self):
+        # The file is immutable, so a copy only needs its own attrs
+        return ChunkedFrame(self.path, dict(self.attrs), self.columns)
+
+    def iter_chunks(self, columns=None):
+        """Yields one pandas DataFrame per row group."""
+        cols = self.columns if columns is None else list(columns)
+        for i in range(self._file.num_row_groups):
+            yield self._file.read_row_group(i, columns=cols).to_pandas()
+
+    def slice(self, start, stop):
+        """
+        Rows [start, stop) as a DataFrame, reading only the row groups they
+        live in. This is all the Monitor ever materializes.
+        """
+        parts, offset = [], 0
+        for i in range(self._file.num_row_groups):
+            n = self._file.metadata.row_group(i).num_rows
+            if offset + n > start and offset < stop:
+                part = self._file.read_row_group(i, columns=self.columns).to_pandas()
+                parts.append(part.iloc[max(start - offset, 0):stop - offset])
+            offset += n
+            if offset >= stop:
+                break
+        if not parts:
+            return pd.DataFrame(columns=self.columns)
+        out = pd.concat(parts)
+        out.index = pd.RangeIndex(start, start + len(out))
+        return out
+
+    def head(self, n=5):
+        return self.slice(0, n)
+
+    def tail(self, n=5):
+        return self.slice(max(len(self) - n, 0), len(self))
+
+    def to_pandas(self):
+        df = self._file.read(columns=self.columns).to_pandas()
+        df.attrs = dict(self.attrs)
+        return df
+
+    def sibling(self):
+        """A fresh path next to this file for an operation's output."""
+        return os.path.join(os.path.dirname(self.path), f"chunked_{uuid.uuid4().hex[:12]}.parquet")
+
+# --- WRITING ---
+def _arrow_schema(chunk):
+    import pyarrow as pa
+
+    sample = pa.Schema.from_pandas(chunk, preserve_index=False)
+    # All-null in the first chunk: store as text so later chunks still fit
+    return pa.schema([pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f for f in sample])
+
+def _fit(chunk, schema):
+    """
+    Coerces a chunk whose types drifted from the first chunk's (numbers in
+    a text column, text in a numeric column) to the file schema.
+    """
+    import pyarrow as pa
+
+    chunk = chunk.copy()
+    for field in schema:
+        col = chunk[field.name]
+        if pa.types.is_string(field.type) or pa.types.is_large_string(field.type):
+            chunk[field.name] = col.astype(object).where(col.isna(), col.astype(str))
+        elif pa.types.is_integer(field.type) or pa.types.is_floating(field.type):
+            chunk[field.name] = pd.to_numeric(col, errors="coerce")
+    return chunk
+
+def write_chunks(chunks, path, attrs=None):
+    """
+    Writes an iterable of DataFrames (same columns) as one Parquet row group
+    each and returns the ChunkedFrame. Version tokens are fresh.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer, schema, columns = None, None, []
+    try:
+        for chunk in chunks:
+            if writer is None:
+                columns = list(chunk.columns)
+                schema = _arrow_schema(chunk)
+                writer = pq.ParquetWriter(path, schema)
+            if len(chunk) == 0:
+                continue
+            try:
+                table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                table = pa.Table.from_pandas(_fit(chunk, schema), schema=schema, preserve_index=False)
+            writer.write_table(table)
+        if writer is None:
+            # No chunks at all: an empty file with no columns
+            schema = pa.schema([])
+            writer = pq.ParquetWriter(path, schema)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    attrs = {k: v for k, v in (attrs or {}).items() if k != "col_versions"}
+    frame = ChunkedFrame(path, attrs)
+    touch_columns(frame)
+    return frame
+
+def map_chunks(frame, fn):
+    """Streams fn(chunk) for every chunk into a new ChunkedFrame."""
+    return write_chunks((fn(chunk) for chunk in frame.iter_chunks()), frame.sibling(), frame.attrs)
+
+# --- STREAMING OPERATIONS ---
+def filter_chunks(frame, tree):
+    from filter_expr import filter_mask
+
+    return map_chunks(frame, lambda chunk: chunk[filter_mask(chunk, tree)])
+
+class _HashRuns:
+    """
+    Set of uint64 row hashes kept as sorted runs; runs of similar size are
+    merged (LSM-style), so lookups and inserts stay O(log n) amortized.
+    """
+    def __init__(self):
+        self.runs = []
+
+    def contains(self, hashes):
+        found = np.zeros(len(hashes), dtype=bool)
+        for run in self.runs:
+            if run.size == 0:
+                continue
+            pos = np.minimum(np.searchsorted(run, hashes), len(run) - 1)
+            found |= run[pos] == hashes
+        return found
+
+    def add(self, hashes):
+        if hashes.size == 0:
+            return # A chunk of repeats adds nothing; an empty run would break contains()
+        self.runs.append(np.sort(hashes))
+        while len(self.runs) > 1 and len(self.runs[-1]) >= len(self.runs[-2]):
+            last = self.runs.pop()
+            self.runs[-1] = np.sort(np.concatenate([self.runs[-1], last]))
+
+def dedupe_chunks(frame, subset=None):
+    """
+    Keeps the first occurrence of every row (or subset key) across all
+    chunks, like drop_duplicates(keep='first'). Memory is 8 bytes per
+    distinct row.
+
+    Rows count as equal when their 64-bit hashes are equal; values are
+    not compared. Two distinct rows collide with probability about
+    n^2 / 2^65 (~3e-4 for 100 million distinct rows), and the later one
+    is then dropped.
+    """
+    seen = _HashRuns()
+    cols = list(subset) if subset else frame.columns
+
+    def keep_first(chunk):
+        hashes = pd.util.hash_pandas_object(chunk[cols], index=False).to_numpy(dtype=np.uint64)
+        first = ~pd.Series(hashes).duplicated(keep="first").to_numpy()
+        keep = first & ~seen.contains(hashes)
+        seen.add(hashes[keep])
+        return chunk[keep]
+
+    return map_chunks(frame, keep_first)
+
+GROUP_AGGS = ("count", "sum", "mean", "min", "max")
+
+def group_partial(chunk, by, value=None):
+    """Mergeable per-group state of one chunk: count (+ sum/min/max of value)."""
+    keys = [chunk[b] for b in by]
+    if value is None:
+        return chunk.groupby(keys, dropna=False).size().to_frame("count")
+    values = pd.to_numeric(chunk[value], errors="coerce")
+    return values.groupby(keys, dropna=False).agg(["count", "sum", "min", "max"])
+
+def group_combine(a, b):
+    if a is None:
+        return b
+    how = {c: {"min": "min", "max": "max"}.get(c, "sum") for c in a.columns}
+    return pd.concat([a, b]).groupby(level=list(range(a.index.nlevels)), dropna=False).agg(how)
+
+def group_finish(state, by, agg="count", value=None):
+    """Turns merged state into the result table: by columns + one aggregate."""
+    if state is None:
+        return pd.DataFrame(columns=list(by) + [agg])
+    if value is None or agg == "count":
+        out = state["count"]
+    elif agg == "mean":
+        out = state["sum"] / state["count"].where(state["count"] > 0)
+    else:
+        out = state[agg]
+    name = agg if value is None else f"{value}_{agg}"
+    result = out.rename(name).reset_index()
+    result.columns = list(by) + [name]
+    return result
+
+def group_chunks(frame, by, agg="count", value=None):
+    state = None
+    for chunk in frame.iter_chunks(list(by) + ([value] if value else [])):
+        state = group_combine(state, group_partial(chunk, by, value))
+    return group_finish(state, by, agg, value)
+
+# --- LOADING ---
+def ingest_file(path, target, ingestor, chunk_lines=200000):
+    """
+    Out-of-core pipeline for a text file: ingest chunk_lines lines at a
+    time, infer the schema on the first chunk, materialize every chunk
+    into a row group of target, then lock. Peak memory is about one chunk.
+    """
+    import itertools
+
+    from phase5_schema import SchemaInferenceEngine
+    from phase6_materializer import DataMaterializer
+    from phase9_finalize import SchemaLockMaster
+
+    with open(path, encoding="utf-8", errors="replace") as source:
+        frames = ingestor.iter_diagnostic_frames(source, chunk_lines)
+        first = next(frames, None)
+        if first is None:
+            raise ValueError(f"'{path}' has no data lines.")
+        schema = SchemaInferenceEngine().infer(first)
+        frame = DataMaterializer().materialize_chunked(itertools.chain([first], frames), schema, target)
+    return SchemaLockMaster().lock(frame, schema)
@@ -0,0 +1,69 @@
+"""
+JEFF v7.9: COLUMN-PARALLEL EXECUTOR
+-----------------------------------
+Role: Spread Independent Per-Column Work Across Cores
+
+Materialization, validation and profiling do the same work for every
+column, and no column depends on another. ColumnExecutor.map() runs
+those per-column tasks on a shared thread pool; pandas/NumPy kernels
+(value_counts, isna, hashing, reductions) release the GIL, so threads
+scale on wide frames. Work that is pure Python (list extraction, type
+scans) holds the GIL; with mode='process' those tasks (flagged
+pure_python=True) go to a process pool instead, at the cost of
+pickling each column to the worker.
+
+Configuration (constructor arguments, or the environment for the
+shared COLUMN_EXECUTOR):
+    JEFF_COLUMN_WORKERS   worker count (default: CPU cores; 1 = serial)
+    JEFF_COLUMN_MODE      'thread' (default) or 'process'
+Frames with fewer than min_columns columns run serially; the pool
+overhead is not worth it there.
+"""
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+_POOLS = {}
+_POOL_LOCK = threading.Lock()
+
+def _pool(kind, workers):
+    # One pool per (kind, size), shared by every executor and session
+    with _POOL_LOCK:
+        key = (kind, workers)
+        if key not in _POOLS:
+            if kind == "process":
+                _POOLS[key] = ProcessPoolExecutor(max_workers=workers)
+            else:
+                _POOLS[key] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="jeff-col")
+        return _POOLS[key]
+
+class ColumnExecutor:
+    def __init__(self, workers=None, mode=None, min_columns=4):
+        workers = workers or int(os.environ.get("JEFF_COLUMN_WORKERS", 0)) or os.cpu_count() or 1
+        mode = mode or os.environ.get("JEFF_COLUMN_MODE", "thread")
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown column executor mode '{mode}'. Use 'thread' or 'process'.")
+        self.workers = max(int(workers), 1)
+        self.mode = mode
+        self.min_columns = min_columns
+
+    def map(self, fn, items, pure_python=False):
+        """
+        [fn(item) for item in items], in order, spread over the pool.
+        pure_python=True sends the tasks to processes in 'process' mode,
+        so fn and the items must be picklable (module-level functions).
+        """
+        items = list(items)
+        nested = threading.current_thread().name.startswith("jeff-col") # A task mapping again must not wait on its own pool
+        if self.workers == 1 or len(items) < self.min_columns or nested:
+            return [fn(item) for item in items]
+        kind = "process" if pure_python and self.mode == "process" else "thread"
+        pool = _pool(kind, self.workers)
+        if kind == "process":
+            # Few, larger pickles: one batch of columns per worker round-trip
+            chunksize = max(len(items) // (self.workers * 4), 1)
+            return list(pool.map(fn, items, chunksize=chunksize))
+        return list(pool.map(fn, items))
+
+COLUMN_EXECUTOR = ColumnExecutor()
@@ -0,0 +1,141 @@
+"""
+JEFF v7.4: COMMAND RUNNER
+-------------------------
+Role: Background Execution of Analyst Commands (One Runner per Session)
+
+Commands run on the session's worker threads against a private copy of
+the active frame, so the UI stays responsive and the live frame is never
+half-modified. A finished job is committed by the UI thread (store +
+undo log) only if it succeeded, was not cancelled or superseded, and the
+store has not changed since the job was submitted.
+
+Python threads cannot be interrupted, so cancelling a running action
+marks it abandoned: it finishes in the background and its result is
+dropped. Queued jobs never start.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from instrumentation import TRACER
+
+class CommandJob:
+    """
+    Handle for one submitted command. spans fills up with the timings of
+    the phases/actions the job has finished so far.
+    """
+    def __init__(self, command, intent, base_version):
+        self.command = command
+        self.intent = intent
+        self.base_version = base_version # store.version the job was computed from
+        self.status = "queued" # queued | running | done | failed | cancelled | superseded
+        self.result = None     # (df, msg, artifact) once done
+        self.error = None
+        self.spans = []
+        self.collected = False # Handled by the UI thread (committed or dropped)
+        self.submitted_at = time.perf_counter()
+        self.started_at = None
+        self.finished_at = None
+        self._cancel = threading.Event()
+        self._finished = threading.Event()
+
+    @property
+    def finished(self):
+        return self._finished.is_set()
+
+    @property
+    def abandoned(self):
+        return self._cancel.is_set()
+
+    @property
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.perf_counter()) - self.started_at
+
+    def cancel(self, reason="cancelled"):
+        if self.collected:
+            return
+        self._cancel.set()
+        self.status = reason
+
+    def wait(self, timeout=None):
+        return self._finished.wait(timeout)
+
+class CommandRunner:
+    def __init__(self, action_suite, workers=2):
+        # Two threads, so an abandoned slow job does not hold up the next command
+        self.action_suite = action_suite
+        self.jobs = []
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="jeff-cmd")
+
+    @property
+    def current(self):
+        return self.jobs[-1] if self.jobs else None
+
+    def submit(self, command, intent, df, base_version, memory=False):
+        """
+        Queues the command against df. An older job still in flight is
+        superseded: its result will not be committed. memory=True traces
+        peak allocation in the job's spans.
+        """
+        for job in self.jobs:
+            job.cancel("superseded")
+        job = CommandJob(command, intent, base_version)
+        self.jobs = [job]
+        self._pool.submit(self._run, job, df, memory)
+        return job
+
+    def _run(self, job, df, memory):
+        try:
+            if job.abandoned:
+                return
+            job.status = "running"
+            job.started_at = time.perf_counter()
+            with TRACER.sink(job.spans, memory):
+                # Actions edit in place; the live frame must stay untouched until commit
+                result = self.action_suite.execute(job.intent, df.copy())
+            if job.abandoned:
+                return
+            if result[1].startswith("Error:"):
+                # The suite reports failures as a message; the copy may be half-edited
+                job.error = result[1][len("Error:"):].strip()
+                job.status = "failed"
+            else:
+                job.result = result
+                job.status = "done"
+        except Exception as e:
+            if not job.abandoned:
+                job.error = str(e)
+                job.status = "failed"
+        finally:
+            job.finished_at = time.perf_counter()
+            job._finished.set()
+
+    def collect(self, store):
+        """
+        Called from the UI thread. Commits the current job to store if it
+        succeeded; returns the job once it is handled (committed or dropped),
+        None while it is still running.
+        """
+        job = self.current
+        if job is None or job.collected:
+            return None
+        if job.abandoned:
+            job.collected = True # Cancelled: drop now, don't wait for the thread
+            return job
+        if not job.finished:
+            return None
+        job.collected = True # A rerun must not apply it twice
+        if job.status == "done" and store.version != job.base_version:
+            job.status = "superseded" # Data was reloaded/undone meanwhile
+        if job.status == "done":
+            new_df = job.result[0]
+            store.push_undo(store.df) # The live frame was never modified, no copy needed
+            store.df = new_df
+        return job
+
+    def cancel(self):
+        if self.current is not None:
+            self.current.cancel()
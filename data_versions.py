@@ -0,0 +1,51 @@
+"""
+JEFF v6.6: COLUMN VERSION TOKENS
+--------------------------------
+Role: Cache Keys for Per-Column Results
+
+Every user-facing column carries a version token in
+df.attrs["col_versions"]. Tokens travel with the frame through copies,
+undo snapshots and spill files, and are replaced whenever an action
+changes a column's values. Anything cached per column (plots, stats,
+sketches) keys on the token, so unchanged columns hit the cache and
+undo restores the old token together with the old data.
+"""
+
+import itertools
+import threading
+import uuid
+
+# Tokens are unique per process, so frames resumed from disk never collide
+_PROCESS = uuid.uuid4().hex[:8]
+_COUNTER = itertools.count(1)
+_LOCK = threading.Lock()
+
+def _new_token():
+    with _LOCK:
+        return f"{_PROCESS}.{next(_COUNTER)}"
+
+def column_version(df, col):
+    """
+    Returns the version token of df[col], assigning one on first use.
+    """
+    versions = df.attrs.get("col_versions", {})
+    if col not in versions:
+        versions = {**versions, col: _new_token()}
+        df.attrs["col_versions"] = versions
+    return versions[col]
+
+def touch_columns(df, cols=None):
+    """
+    Marks columns as changed. cols=None means every column (row-level edits).
+    """
+    versions = dict(df.attrs.get("col_versions", {}))
+    for col in (df.columns if cols is None else cols):
+        versions[col] = _new_token()
+    df.attrs["col_versions"] = {c: v for c, v in versions.items() if c in df.columns}
+
+def rename_columns(df, mapping):
+    """
+    Carries tokens over to renamed columns; values are unchanged.
+    """
+    versions = df.attrs.get("col_versions", {})
+    df.attrs["col_versions"] = {mapping.get(c, c): v for c, v in versions.items()}
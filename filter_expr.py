@@ -0,0 +1,337 @@
+"""
+JEFF v7.1: FILTER EXPRESSIONS
+-----------------------------
+Role: Compound 'filter' Predicates -> One Fused Mask
+
+parse_filter() turns the text after 'filter' into an expression tree of
+plain dicts (so it can sit in intent parameters and command logs):
+
+    {'op': 'or'|'and', 'args': [node, ...]}
+    {'op': 'not', 'arg': node}
+    {'op': 'cmp', 'column': c, 'cmp': '>'|'<'|'>='|'<='|'=='|'!=', 'value': v}
+    {'op': 'between', 'column': c, 'low': v, 'high': v}
+    {'op': 'in', 'column': c, 'values': [v, ...]}
+    {'op': 'contains'|'startswith'|'endswith', 'column': c, 'value': v}
+
+Precedence is not > and > or; parentheses group. filter_mask() evaluates
+the tree into one boolean array: numeric subtrees are fused into a single
+DataFrame.eval() call (numexpr when installed), text predicates run as
+vectorized .str operations (case-insensitive), and the frame is indexed
+with the result exactly once.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+COMPARATORS = {'>=': '>=', '<=': '<=', '!=': '!=', '==': '==', '=': '==', '>': '>', '<': '<'}
+WORD_OPS = [
+    (('is', 'not'), ('cmp', '!=')),
+    (('not', 'in'), ('not_in', None)),
+    (('starts', 'with'), ('startswith', None)),
+    (('ends', 'with'), ('endswith', None)),
+    (('not', 'contains'), ('not_contains', None)),
+    (('startswith',), ('startswith', None)),
+    (('endswith',), ('endswith', None)),
+    (('contains',), ('contains', None)),
+    (('between',), ('between', None)),
+    (('in',), ('in', None)),
+    (('is',), ('cmp', '==')),
+    (('equals',), ('cmp', '==')),
+]
+TOKEN = re.compile(r"\s*(?:('[^']*'|\"[^\"]*\")|(>=|<=|!=|==|=|>|<|\(|\)|,)|([^\s'\"<>=!(),]+))")
+NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+
+def _tokenize(text):
+    tokens, pos = [], 0
+    text = text.strip()
+    while pos < len(text):
+        match = TOKEN.match(text, pos)
+        if not match or match.end() == pos:
+            raise ValueError(f"Cannot read filter near '{text[pos:]}'.")
+        quoted, symbol, word = match.groups()
+        if quoted is not None:
+            tokens.append(('str', quoted[1:-1]))
+        elif symbol is not None:
+            tokens.append(('sym', symbol))
+        else:
+            tokens.append(('word', word))
+        pos = match.end()
+    return tokens
+
+def _literal(kind, text):
+    return float(text) if kind == 'word' and NUMBER.fullmatch(text) else text
+
+class _Parser:
+    def __init__(self, tokens, columns):
+        self.tokens = tokens
+        self.pos = 0
+        # Longest names first so 'Join Date' wins over 'Join'
+        self.columns = sorted(columns, key=lambda c: -len(str(c).split()))
+
+    def peek(self, offset=0):
+        i = self.pos + offset
+        return self.tokens[i] if i < len(self.tokens) else (None, None)
+
+    def is_word(self, *words, offset=0):
+        kind, text = self.peek(offset)
+        return kind == 'word' and text.lower() in words
+
+    def expect(self, symbol):
+        if self.peek() != ('sym', symbol):
+            raise ValueError(f"Expected '{symbol}' in filter.")
+        self.pos += 1
+
+    def parse(self):
+        node = self.parse_or()
+        if self.pos != len(self.tokens):
+            raise ValueError(f"Unexpected '{self.peek()[1]}' in filter.")
+        return node
+
+    def parse_or(self):
+        args = [self.parse_and()]
+        while self.is_word('or'):
+            self.pos += 1
+            args.append(self.parse_and())
+        return args[0] if len(args) == 1 else {'op': 'or', 'args': args}
+
+    def parse_and(self):
+        args = [self.parse_not()]
+        while self.is_word('and'):
+            self.pos += 1
+            args.append(self.parse_not())
+        return args[0] if len(args) == 1 else {'op': 'and', 'args': args}
+
+    def parse_not(self):
+        if self.is_word('not'):
+            self.pos += 1
+            return {'op': 'not', 'arg': self.parse_not()}
+        if self.peek() == ('sym', '('):
+            self.pos += 1
+            node = self.parse_or()
+            self.expect(')')
+            return node
+        return self.parse_predicate()
+
+    def parse_column(self):
+        kind, text = self.peek()
+        if kind == 'str':
+            match = next((c for c in self.columns if str(c).lower() == text.lower()), None)
+            if match is not None:
+                self.pos += 1
+                return match
+        for col in self.columns:
+            words = str(col).lower().split()
+            found = [self.peek(i) for i in range(len(words))]
+            if all(k == 'word' and t.lower() == w for (k, t), w in zip(found, words)):
+                self.pos += len(words)
+                return col
+        raise ValueError(f"No column matches '{text}' in filter." if text else "Filter needs a column.")
+
+    def parse_operator(self):
+        kind, text = self.peek()
+        if kind == 'sym' and text in COMPARATORS:
+            self.pos += 1
+            return 'cmp', COMPARATORS[text]
+        for words, op in WORD_OPS:
+            if all(self.is_word(w, offset=i) for i, w in enumerate(words)):
+                self.pos += len(words)
+                return op
+        raise ValueError(f"Unknown filter operator '{text}'.")
+
+    def parse_value(self):
+        kind, text = self.peek()
+        if kind == 'str':
+            self.pos += 1
+            return text
+        if kind != 'word' or text.lower() in ('and', 'or'):
+            raise ValueError("Filter is missing a value.")
+        # Bare multi-word values ("New York") run until and/or/,/)
+        words = []
+        while self.peek()[0] == 'word' and not self.is_word('and', 'or'):
+            words.append(self.peek()[1])
+            self.pos += 1
+        return _literal('word', " ".join(words))
+
+    def parse_values(self):
+        grouped = self.peek() == ('sym', '(')
+        if grouped:
+            self.pos += 1
+        values = [self.parse_value()]
+        while self.peek() == ('sym', ','):
+            self.pos += 1
+            values.append(self.parse_value())
+        if grouped:
+            self.expect(')')
+        return values
+
+    def parse_predicate(self):
+        col = self.parse_column()
+        op, cmp = self.parse_operator()
+        if op == 'cmp':
+            return {'op': 'cmp', 'column': col, 'cmp': cmp, 'value': self.parse_value()}
+        if op == 'between':
+            low = self.parse_value()
+            if not self.is_word('and'):
+                raise ValueError("Use 'between X and Y'.")
+            self.pos += 1
+            return {'op': 'between', 'column': col, 'low': low, 'high': self.parse_value()}
+        if op in ('in', 'not_in'):
+            node = {'op': 'in', 'column': col, 'values': self.parse_values()}
+        else:
+            node = {'op': op.replace('not_', ''), 'column': col, 'value': self.parse_value()}
+        return {'op': 'not', 'arg': node} if op.startswith('not_') else node
+
+def parse_filter(text, columns):
+    """
+    Parses e.g. "Age >= 30 and (City in NY, LA or Name contains 'smith')".
+    Raises ValueError with a user-facing message on bad input.
+    """
+    return _Parser(_tokenize(text), list(columns)).parse()
+
+def _show(value):
+    return f"{value:g}" if isinstance(value, float) else repr(value)
+
+def describe(node):
+    op = node['op']
+    if op in ('and', 'or'):
+        return f" {op} ".join(f"({describe(a)})" if a['op'] in ('and', 'or') else describe(a) for a in node['args'])
+    if op == 'not':
+        return f"not ({describe(node['arg'])})"
+    if op == 'cmp':
+        return f"{node['column']} {node['cmp']} {_show(node['value'])}"
+    if op == 'between':
+        return f"{node['column']} between {_show(node['low'])} and {_show(node['high'])}"
+    if op == 'in':
+        return f"{node['column']} in ({', '.join(_show(v) for v in node['values'])})"
+    return f"{node['column']} {op} {_show(node['value'])}"
+
+# --- EVALUATION ---
+def _is_numeric(series):
+    return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+def _as_bool(result):
+    if isinstance(result, pd.Series):
+        return result.fillna(False).to_numpy(dtype=bool)
+    return np.asarray(result, dtype=bool)
+
+class _Evaluator:
+    def __init__(self, df):
+        self.df = df
+        self.env = {}
+        self._lowered = {} # column -> lower-cased string view, built once per filter
+
+    def lowered(self, col):
+        if col not in self._lowered:
+            self._lowered[col] = self.df[col].astype("string").str.lower()
+        return self._lowered[col]
+
+    def number(self, col, value):
+        if isinstance(value, float):
+            return value
+        try: return float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Column '{col}' is numeric; '{value}' is not a number.")
+
+    def bind(self, value):
+        name = f"v{len(self.env)}"
+        self.env[name] = value
+        return f"@{name}"
+
+    def to_eval(self, node):
+        """
+        eval() source for a subtree of numeric comparisons, or None if any
+        leaf needs string/datetime handling.
+        """
+        op = node['op']
+        if op in ('and', 'or'):
+            parts = [self.to_eval(a) for a in node['args']]
+            if any(p is None for p in parts):
+                return None
+            return f" {'&' if op == 'and' else '|'} ".join(f"({p})" for p in parts)
+        if op == 'not':
+            inner = self.to_eval(node['arg'])
+            return None if inner is None else f"~({inner})"
+        if op not in ('cmp', 'between') or not _is_numeric(self.df[node['column']]):
+            return None
+        col = f"`{node['column']}`"
+        if op == 'between':
+            low = self.bind(self.number(node['column'], node['low']))
+            high = self.bind(self.number(node['column'], node['high']))
+            return f"({col} >= {low}) & ({col} <= {high})"
+        return f"{col} {node['cmp']} {self.bind(self.number(node['column'], node['value']))}"
+
+    def fused(self, source):
+        return _as_bool(self.df.eval(source, local_dict=self.env))
+
+    def mask(self, node):
+        source = self.to_eval(node)
+        if source is not None:
+            return self.fused(source)
+
+        op = node['op']
+        if op in ('and', 'or'):
+            # Numeric siblings still share one eval() call
+            sources = [(a, self.to_eval(a)) for a in node['args']]
+            numeric = [s for _, s in sources if s is not None]
+            joiner = f" {'&' if op == 'and' else '|'} "
+            masks = [self.fused(joiner.join(f"({s})" for s in numeric))] if numeric else []
+            masks += [self.mask(a) for a, s in sources if s is None]
+            combine = np.logical_and if op == 'and' else np.logical_or
+            return combine.reduce(masks)
+        if op == 'not':
+            return ~self.mask(node['arg'])
+        return self.leaf(node)
+
+    def leaf(self, node):
+        col, op = node['column'], node['op']
+        series = self.df[col]
+        if _is_numeric(series):
+            if op == 'in':
+                return series.isin([self.number(col, v) for v in node['values']]).to_numpy()
+            return self.text_leaf(col, op, node) # contains/startswith on numbers
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return self.ordered_leaf(series, node, pd.Timestamp)
+        return self.text_leaf(col, op, node)
+
+    def ordered_leaf(self, series, node, convert):
+        if node['op'] == 'between':
+            return _as_bool((series >= convert(node['low'])) & (series <= convert(node['high'])))
+        if node['op'] == 'in':
+            return series.isin([convert(v) for v in node['values']]).to_numpy()
+        if node['op'] == 'cmp':
+            value = convert(node['value'])
+            if node['cmp'] == '!=':
+                return ~_as_bool(series.eq(value)) # Missing cells count as "not equal", like pandas
+            return _as_bool({
+                '>': series.gt, '<': series.lt, '>=': series.ge,
+                '<=': series.le, '==': series.eq, '!=': series.ne,
+            }[node['cmp']](value))
+        return self.text_leaf(node['column'], node['op'], node)
+
+    def text_leaf(self, col, op, node):
+        text = self.lowered(col)
+        if op == 'contains':
+            return _as_bool(text.str.contains(_text(node['value']), regex=False))
+        if op == 'startswith':
+            return _as_bool(text.str.startswith(_text(node['value'])))
+        if op == 'endswith':
+            return _as_bool(text.str.endswith(_text(node['value'])))
+        if op == 'in':
+            return _as_bool(text.isin([_text(v) for v in node['values']]))
+        return self.ordered_leaf(text, node, _text)
+
+def _text(value):
+    # 30.0 parsed from the command should match the cell text '30'
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).lower()
+
+def filter_mask(df, tree):
+    """
+    Boolean numpy array selecting the rows of df that satisfy tree.
+    """
+    if len(df) == 0:
+        return np.zeros(0, dtype=bool)
+    return _Evaluator(df).mask(tree)
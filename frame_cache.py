@@ -0,0 +1,87 @@
+"""
+JEFF v7.5: SHARED FRAME CACHE
+-----------------------------
+Role: One Parse per Distinct Input, Shared Across Sessions
+
+Locked, materialized frames are cached process-wide under a hash of the
+raw input text, with LRU eviction under a global memory budget. When
+several sessions load the same paste, the first one runs ingest ->
+schema -> materialize -> lock and the rest (including ones arriving
+while it is still building) get the same frame object.
+
+Cached frames are shared read-only. Nothing in the app edits the active
+frame in place: the CommandRunner runs every command on its own copy,
+so a session's first mutation is where its private copy is made.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+def content_key(raw_text):
+    return hashlib.blake2b(raw_text.encode("utf-8"), digest_size=16).hexdigest()
+
+def frame_bytes(df):
+    # deep=True counts the Python objects behind text and list columns
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+class FrameCache:
+    def __init__(self, budget_bytes=1024 ** 3):
+        self.budget_bytes = budget_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._frames = OrderedDict() # key -> (df, nbytes)
+        self._building = {}          # key -> Event, so concurrent loads parse once
+        self._lock = threading.Lock()
+
+    @property
+    def used_bytes(self):
+        with self._lock:
+            return sum(size for _, size in self._frames.values())
+
+    def __len__(self):
+        return len(self._frames)
+
+    def get_or_build(self, raw_text, build):
+        """
+        Returns (df, hit). build(raw_text) runs at most once per key at a
+        time; callers asking for a key that is being built wait for it.
+        """
+        key = content_key(raw_text)
+        while True:
+            with self._lock:
+                if key in self._frames:
+                    self._frames.move_to_end(key)
+                    self.hits += 1
+                    return self._frames[key][0], True
+                pending = self._building.get(key)
+                if pending is None:
+                    pending = self._building[key] = threading.Event()
+                    self.misses += 1
+                    break
+            pending.wait() # Someone else is parsing this input; then retry the lookup
+
+        try:
+            df = build(raw_text)
+            self._store(key, df)
+            return df, False
+        finally:
+            with self._lock:
+                self._building.pop(key).set()
+
+    def _store(self, key, df):
+        size = frame_bytes(df)
+        if size > self.budget_bytes:
+            return # Would evict everything else and still not fit
+        with self._lock:
+            self._frames[key] = (df, size)
+            total = sum(s for _, s in self._frames.values())
+            while total > self.budget_bytes:
+                _, (_, evicted) = self._frames.popitem(last=False)
+                total -= evicted
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
@@ -0,0 +1,200 @@
+"""
+JEFF v7.3: INSTRUMENTATION
+--------------------------
+Role: Per-Phase / Per-Action Timing & Memory Spans
+
+Every pipeline phase and action runs inside a span that records wall
+time, CPU time (of the calling thread), rows in/out and, optionally,
+peak traced memory. Spans are collected per thread with TRACER.sink(),
+so each Streamlit session (or batch file) sees only its own work.
+
+When nothing is collecting, @traced and TRACER.span() reduce to one
+attribute check; tracemalloc is only switched on while a sink asks for
+memory, because it slows allocation-heavy code down noticeably.
+Peak memory is process-wide, so concurrent sessions inflate each other's.
+"""
+
+import functools
+import json
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+
+import pandas as pd
+
+class Span:
+    __slots__ = ("name", "rows_in", "rows_out", "depth", "_wall", "_cpu", "_mem_start", "_peak")
+
+    def __init__(self, name, rows_in, depth):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.depth = depth
+
+class _NullSpan:
+    """Stand-in when tracing is off; setting rows_out is a no-op."""
+    rows_out = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+NULL_SPAN = _NullSpan()
+
+def _is_frame(obj):
+    # ChunkedFrame (out-of-core) counts as a frame too
+    return isinstance(obj, pd.DataFrame) or hasattr(obj, "iter_chunks")
+
+def _rows(result):
+    if isinstance(result, tuple) and result:
+        result = result[0]
+    if _is_frame(result):
+        return len(result)
+    if isinstance(result, int) and not isinstance(result, bool):
+        return result
+    return None
+
+class Tracer:
+    def __init__(self, history=1000):
+        self.enabled = False # True records every thread into self.records
+        self.records = deque(maxlen=history)
+        self._local = threading.local()
+        self._mem_users = 0
+        self._mem_started = False
+        self._lock = threading.Lock()
+
+    @property
+    def active(self):
+        return self.enabled or getattr(self._local, "sink", None) is not None
+
+    @contextmanager
+    def sink(self, records, memory=False):
+        """
+        Collects spans from this thread into `records` (a list) while open.
+        memory=True also traces peak allocation with tracemalloc.
+        """
+        previous = getattr(self._local, "sink", None), getattr(self._local, "memory", False)
+        self._local.sink, self._local.memory = records, memory
+        if memory:
+            self._start_memory()
+        try:
+            yield records
+        finally:
+            self._local.sink, self._local.memory = previous
+            if memory:
+                self._stop_memory()
+
+    def span(self, name, rows_in=None):
+        if not self.active:
+            return NULL_SPAN
+        return self._span(name, rows_in)
+
+    @contextmanager
+    def _span(self, name, rows_in):
+        stack = self._local.__dict__.setdefault("stack", [])
+        span = Span(name, rows_in, len(stack))
+        memory = getattr(self._local, "memory", False) and tracemalloc.is_tracing()
+        if memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                # Keep the parent's peak before resetting it for this span
+                stack[-1]._peak = max(stack[-1]._peak, peak)
+            tracemalloc.reset_peak()
+            span._mem_start, span._peak = current, current
+        stack.append(span)
+        span._wall, span._cpu = time.perf_counter(), time.thread_time()
+        status = "ok"
+        try:
+            yield span
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            wall = time.perf_counter() - span._wall
+            cpu = time.thread_time() - span._cpu
+            stack.pop()
+            record = {
+                "name": span.name,
+                "start": time.time() - wall,
+                "wall_ms": round(wall * 1000, 3),
+                "cpu_ms": round(cpu * 1000, 3),
+                "peak_mb": None,
+                "rows_in": span.rows_in,
+                "rows_out": span.rows_out,
+                "depth": span.depth,
+                "status": status,
+            }
+            if memory and tracemalloc.is_tracing():
+                peak = max(span._peak, tracemalloc.get_traced_memory()[1])
+                record["peak_mb"] = round((peak - span._mem_start) / (1024 * 1024), 3)
+                if stack:
+                    stack[-1]._peak = max(stack[-1]._peak, peak)
+            self._emit(record)
+
+    def _emit(self, record):
+        sink = getattr(self._local, "sink", None)
+        if sink is not None:
+            sink.append(record)
+        if self.enabled:
+            self.records.append(record)
+
+    def _start_memory(self):
+        with self._lock:
+            self._mem_users += 1
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._mem_started = True
+
+    def _stop_memory(self):
+        with self._lock:
+            self._mem_users -= 1
+            if self._mem_users == 0 and self._mem_started:
+                tracemalloc.stop()
+                self._mem_started = False
+
+TRACER = Tracer()
+
+def traced(name):
+    """
+    Decorator: runs the function inside a span. rows_in is the length of
+    the first DataFrame argument, rows_out that of the returned frame
+    (or the first element of a returned tuple, or a returned row count).
+    """
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not TRACER.active:
+                return fn(*args, **kwargs)
+            rows_in = next((len(a) for a in args if _is_frame(a)), None)
+            with TRACER.span(name, rows_in) as span:
+                result = fn(*args, **kwargs)
+                span.rows_out = _rows(result)
+            return result
+        return inner
+    return wrap
+
+def to_jsonl(records):
+    return "".join(json.dumps(r, default=str) + "\n" for r in records)
+
+def summarize(records):
+    """
+    Per-name totals for the sidebar: calls, wall/CPU time, worst peak memory.
+    """
+    if not records:
+        return pd.DataFrame()
+    frame = pd.DataFrame(list(records))
+    table = frame.groupby("name", sort=False).agg(
+        calls=("name", "size"),
+        wall_ms=("wall_ms", "sum"),
+        cpu_ms=("cpu_ms", "sum"),
+        peak_mb=("peak_mb", "max"),
+        rows_out=("rows_out", "last"),
+    )
+    return table.sort_values("wall_ms", ascending=False)
@@ -0,0 +1,67 @@
+"""
+JEFF v6.4: MONITOR VIEW (WINDOWED RENDERING)
+--------------------------------------------
+Role: Constant-Cost Display of Large Frames
+
+Only the visible page of the active frame is sliced and serialized.
+Page slices are cached per data version so paging back and forth or
+rerunning the app does not touch the full frame again. For an
+out-of-core ChunkedFrame only the row groups under the page are read.
+"""
+
+from collections import OrderedDict
+
+import pandas as pd
+
+class PagedView:
+    def __init__(self, page_size=500, cache_pages=8):
+        self.page_size = page_size
+        self.cache_pages = cache_pages
+        self._cache = OrderedDict() # (version, page, page_size) -> DataFrame
+
+    def page_count(self, df):
+        return max((len(df) - 1) // self.page_size + 1, 1)
+
+    def page(self, df, page_no, version):
+        """
+        Returns the user-facing columns of one page (0-based) of df.
+        """
+        page_no = min(max(page_no, 0), self.page_count(df) - 1)
+        key = (version, page_no, self.page_size)
+
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        start = page_no * self.page_size
+        if hasattr(df, 'slice'):
+            window = df.slice(start, start + self.page_size) # ChunkedFrame: bounded read
+        else:
+            window = df.iloc[start:start + self.page_size]
+        clean_cols = [c for c in window.columns if not str(c).startswith('_')]
+        window = window[clean_cols]
+
+        # Drop pages from older data versions first, then the least recently used
+        for stale in [k for k in self._cache if k[0] != version]:
+            del self._cache[stale]
+        self._cache[key] = window
+        while len(self._cache) > self.cache_pages:
+            self._cache.popitem(last=False)
+        return window
+
+
+def head_tail(df, rows=5):
+    """
+    Text summary for the CLI: shape plus the first and last few rows,
+    so print cost does not grow with the frame.
+    """
+    clean_cols = [c for c in df.columns if not str(c).startswith('_')]
+    header = f"[{len(df)} rows x {len(clean_cols)} cols]"
+
+    if len(df) <= rows * 2:
+        return header + "\n" + df.head(rows * 2)[clean_cols].to_string(index=False)
+
+    preview = pd.concat([df.head(rows), df.tail(rows)])[clean_cols]
+    lines = preview.to_string(index=False).splitlines()
+    # Header line + head rows, an ellipsis marker, then the tail rows
+    return "\n".join([header] + lines[:rows + 1] + ["..."] + lines[rows + 1:])
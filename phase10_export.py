@@ -1,28 +1,108 @@
 """
-JEFF v6.1: PROFESSIONAL EXPORT ENGINE (PHASE 10)
+JEFF v6.3: PROFESSIONAL EXPORT ENGINE (PHASE 10)
 ------------------------------------------------
 UPDATED: Conflict Detection (Prevents Overwriting)
+UPDATED: Streaming Writers (Constant-Memory XLSX, CSV, Parquet, Feather)
+UPDATED: Background Export Jobs (Progress + Cancellation)
+UPDATED: Out-of-Core Sources (ChunkedFrame row groups stream straight through)
+
+Rows are written chunk-by-chunk so peak memory stays near one chunk
+instead of several copies of the whole frame. XLSX output spills to
+extra sheets once Excel's row limit is reached.
 """
 
 import pandas as pd
+import io
 import os
 import logging
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from instrumentation import traced
+
+EXCEL_MAX_ROWS = 1048576          # Hard sheet limit, header row included
+SPOOL_MAX_BYTES = 64 * 1024 * 1024 # Spooled downloads move to disk past this size
+
+FORMATS = {
+    '.xlsx': 'xlsx',
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+    '.feather': 'feather',
+}
+
+MIME_TYPES = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+    'feather': 'application/vnd.apache.arrow.file',
+}
+
+_EXPORT_POOL = None
+_POOL_LOCK = threading.Lock()
+
+def _export_pool():
+    """
+    Shared worker pool for background exports. Threads are enough here:
+    the pandas/pyarrow writers release the GIL, and a process pool would
+    have to pickle the whole frame first.
+    """
+    global _EXPORT_POOL
+    with _POOL_LOCK:
+        if _EXPORT_POOL is None:
+            _EXPORT_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="jeff-export")
+        return _EXPORT_POOL
+
+class ExportCancelled(Exception):
+    pass
+
+class ExportJob:
+    """
+    Handle for one background export. The worker updates rows_written and
+    bytes_written as chunks land; path is set once status is 'done'.
+    """
+    def __init__(self, filename, fmt, total_rows):
+        self.filename = filename
+        self.fmt = fmt
+        self.total_rows = total_rows
+        self.rows_written = 0
+        self.bytes_written = 0
+        self.status = "queued" # queued | running | done | cancelled | failed
+        self.path = None
+        self.error = None
+        self._cancel = threading.Event()
+
+    @property
+    def progress(self):
+        return self.rows_written / self.total_rows if self.total_rows else 1.0
+
+    @property
+    def finished(self):
+        return self.status in ("done", "cancelled", "failed")
+
+    def cancel(self):
+        self._cancel.set()
+        if self.status == "queued":
+            self.status = "cancelled"
 
 class ProfessionalExporter:
-    def __init__(self):
+    def __init__(self, chunk_rows=50000):
         self.output_directory = os.getcwd()
+        self.chunk_rows = chunk_rows
 
-    def save(self, df, filename):
+    def save(self, df, filename, artifacts=()):
         """
-        Saves DataFrame to Excel with safety checks.
+        Saves DataFrame to disk with safety checks. The format follows the
+        extension (.xlsx, .csv, .parquet, .feather); Excel is the default.
         Returns: Success Message, Error Message, or 'FILE_EXISTS' status.
         """
         if df is None or df.empty:
             return "❌ No data to export."
 
         # Auto-append extension if missing
-        if not filename.endswith('.xlsx'):
+        ext = os.path.splitext(filename)[1].lower()
+        if ext not in FORMATS:
             filename += '.xlsx'
+            ext = '.xlsx'
 
         full_path = os.path.join(self.output_directory, filename)
 
@@ -30,17 +110,241 @@ class ProfessionalExporter:
         if os.path.exists(full_path):
             return "FILE_EXISTS"
 
-        # --- CLEAN & SAVE ---
-        # Remove internal Jeff columns (starting with _)
-        clean_cols = [col for col in df.columns if not str(col).startswith('_')]
-        export_df = df[clean_cols].copy()
-
         try:
-            export_df.to_excel(full_path, index=False, engine='openpyxl')
-            logging.info(f"Exported to {full_path}")
+            rows = self.stream(df, full_path, FORMATS[ext], artifacts)
+            logging.info(f"Exported {rows} rows to {full_path}")
             return f"✅ Success! Saved as: {filename}"
-        
+
         except PermissionError:
             return f"❌ Error: The file '{filename}' is open. Close it and try again."
         except Exception as e:
-            return f"❌ Critical Error: {str(e)}"
\ No newline at end of file
+            return f"❌ Critical Error: {str(e)}"
+
+    def submit(self, df, filename, artifacts=()):
+        """
+        Starts a background export and returns its ExportJob immediately.
+        The format follows the extension, like save().
+        """
+        ext = os.path.splitext(filename)[1].lower()
+        if ext not in FORMATS:
+            filename += '.xlsx'
+            ext = '.xlsx'
+
+        # Snapshot the user-facing columns so later edits don't leak into the file
+        clean_cols = [col for col in df.columns if not str(col).startswith('_')]
+        job = ExportJob(filename, FORMATS[ext], len(df))
+        _export_pool().submit(self._run_job, job, df[clean_cols], list(artifacts))
+        return job
+
+    def _run_job(self, job, df, artifacts):
+        if job._cancel.is_set():
+            return
+        job.status = "running"
+        full_path = os.path.join(self.output_directory, job.filename)
+
+        def report(rows):
+            if job._cancel.is_set():
+                raise ExportCancelled()
+            job.rows_written = rows
+            job.bytes_written = os.path.getsize(full_path) if os.path.exists(full_path) else 0
+
+        try:
+            if os.path.exists(full_path):
+                raise FileExistsError(f"The file '{job.filename}' already exists.")
+            self.stream(df, full_path, job.fmt, artifacts, progress=report)
+            job.bytes_written = os.path.getsize(full_path)
+            job.path = full_path
+            job.status = "done"
+            logging.info(f"Background export finished: {full_path}")
+        except ExportCancelled:
+            job.status = "cancelled"
+            if os.path.exists(full_path):
+                os.remove(full_path)
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+            logging.error(f"Background export failed: {e}")
+
+    def export_bytes(self, df, fmt='xlsx', artifacts=()):
+        """
+        Builds an in-app download. Output is written to a spooled temp file
+        (RAM for small exports, disk for large ones) and returned as bytes.
+        """
+        with self.open_spool() as spool:
+            self.stream(df, spool, fmt, artifacts)
+            spool.seek(0)
+            return spool.read()
+
+    def open_spool(self):
+        return tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES, mode='w+b')
+
+    # --- STREAMING WRITERS ---
+    @traced("phase10.stream")
+    def stream(self, df, target, fmt='xlsx', artifacts=(), progress=None):
+        """
+        Writes the user-facing columns of df to target (a path or a binary
+        file object) chunk-by-chunk. progress(rows_written) is called after
+        every chunk. Returns the number of data rows written.
+        """
+        writers = {
+            'xlsx': self._write_xlsx,
+            'csv': self._write_csv,
+            'parquet': self._write_parquet,
+            'feather': self._write_feather,
+        }
+        if fmt not in writers:
+            raise ValueError(f"Unsupported export format '{fmt}'.")
+
+        # Remove internal Jeff columns (starting with _)
+        clean_cols = [col for col in df.columns if not str(col).startswith('_')]
+        return writers[fmt](df[clean_cols], target, artifacts, progress or (lambda rows: None))
+
+    def _chunks(self, df):
+        if hasattr(df, 'iter_chunks'):
+            # ChunkedFrame: one row group at a time, never the whole file
+            yield from df.iter_chunks()
+            return
+        for start in range(0, len(df), self.chunk_rows):
+            yield df.iloc[start:start + self.chunk_rows]
+
+    def _write_xlsx(self, df, target, artifacts, progress):
+        import xlsxwriter
+
+        workbook = xlsxwriter.Workbook(target, {
+            'constant_memory': True, # Rows are flushed to disk as soon as they are written
+            'default_date_format': 'yyyy-mm-dd hh:mm:ss',
+            'nan_inf_to_errors': True,
+        })
+        header = [str(c) for c in df.columns]
+        sheet_rows = EXCEL_MAX_ROWS - 1
+        written = 0
+
+        def new_sheet(sheet_no):
+            worksheet = workbook.add_worksheet('Data' if sheet_no == 0 else f'Data_{sheet_no + 1}')
+            worksheet.write_row(0, 0, header)
+            return worksheet
+
+        try:
+            # 1. Data (a new sheet every EXCEL_MAX_ROWS rows)
+            sheet_no, worksheet, row = 0, new_sheet(0), 1
+            for chunk in self._chunks(df):
+                cells = chunk.astype(object).where(chunk.notna(), None)
+                for values in cells.itertuples(index=False, name=None):
+                    if row > sheet_rows:
+                        sheet_no += 1
+                        worksheet, row = new_sheet(sheet_no), 1
+                    worksheet.write_row(row, 0, values)
+                    row += 1
+                written += len(chunk)
+                progress(written)
+
+            # 2. Text Analysis
+            analysis_data = [a['content'] for a in artifacts if a['type'] == 'text']
+            if analysis_data:
+                ws_stats = workbook.add_worksheet('Analysis')
+                for i, text in enumerate(analysis_data):
+                    ws_stats.write(i * 10, 0, text) # Spacing out reports
+
+            # 3. Plots
+            plots = [a for a in artifacts if a['type'] == 'plot']
+            if plots:
+                ws_plots = workbook.add_worksheet('Plots')
+                ws_plots.write(0, 0, "Generated Visualizations")
+                current_row = 2
+                for p in plots:
+                    ws_plots.insert_image(current_row, 1, p['filename'], {'image_data': self._png_stream(p['content'])})
+                    current_row += 25 # Move down for next image
+        finally:
+            workbook.close()
+        return written
+
+    def _write_csv(self, df, target, artifacts, progress):
+        written = 0
+        handle = open(target, 'wb') if isinstance(target, (str, os.PathLike)) else target
+        try:
+            if df.empty:
+                handle.write(df.head(0).to_csv(index=False).encode('utf-8'))
+            for chunk in self._chunks(df):
+                handle.write(chunk.to_csv(index=False, header=(written == 0)).encode('utf-8'))
+                written += len(chunk)
+                progress(written)
+        finally:
+            if handle is not target:
+                handle.close()
+        return written
+
+    def _write_parquet(self, df, target, artifacts, progress):
+        import pyarrow.parquet as pq
+
+        schema = self._arrow_schema(df)
+        written = 0
+        # Each chunk becomes one row group
+        with pq.ParquetWriter(target, schema) as writer:
+            for chunk in self._chunks(df):
+                writer.write_table(self._arrow_table(chunk, schema))
+                written += len(chunk)
+                progress(written)
+        return written
+
+    def _write_feather(self, df, target, artifacts, progress):
+        import pyarrow as pa
+
+        schema = self._arrow_schema(df)
+        written = 0
+        # Feather v2 is the Arrow IPC file format; each chunk is one record batch
+        sink = pa.OSFile(str(target), 'wb') if isinstance(target, (str, os.PathLike)) else target
+        try:
+            with pa.ipc.new_file(sink, schema) as writer:
+                for chunk in self._chunks(df):
+                    writer.write_table(self._arrow_table(chunk, schema))
+                    written += len(chunk)
+                    progress(written)
+        finally:
+            if sink is not target:
+                sink.close()
+        return written
+
+    # --- HELPERS ---
+    def _arrow_schema(self, df):
+        """
+        Infers the Arrow schema from a sample. Mixed-type object columns
+        (numbers and 'N/A' after a named fill) are stored as string, as are
+        columns that are all-null in the sample, so every chunk fits.
+        """
+        import pyarrow as pa
+
+        sample = df.head(self.chunk_rows)
+        fields = []
+        for col in sample.columns:
+            field = None
+            # In memory, check the whole column: text can show up after the sample
+            if isinstance(df, pd.DataFrame) and df[col].dtype == object:
+                kind = pd.api.types.infer_dtype(df[col], skipna=True)
+                if kind.startswith('mixed') and kind != 'mixed-integer-float':
+                    field = pa.field(str(col), pa.string())
+            if field is None:
+                try:
+                    field = pa.Schema.from_pandas(sample[[col]], preserve_index=False).field(0)
+                except (pa.ArrowInvalid, pa.ArrowTypeError):
+                    field = pa.field(str(col), pa.string())
+            if pa.types.is_null(field.type):
+                field = pa.field(str(col), pa.string())
+            fields.append(field)
+        return pa.schema(fields)
+
+    def _arrow_table(self, chunk, schema):
+        import pyarrow as pa
+        from chunked_frame import _fit
+
+        try:
+            return pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Type drift past the sample: coerce the chunk to the schema
+            return pa.Table.from_pandas(_fit(chunk, schema), schema=schema, preserve_index=False)
+
+    def _png_stream(self, content):
+        if isinstance(content, (bytes, bytearray)):
+            return io.BytesIO(content)
+        img_stream = io.BytesIO()
+        content.savefig(img_stream, format='png')
+        return img_stream
@@ -7,6 +7,7 @@ UPDATED: Compound Number Support (ninety-two) & Hyphen Handling
 import re
 import pandas as pd
 import logging
+from instrumentation import traced
 
 class NeuralIngestor:
     def __init__(self):
@@ -88,7 +89,23 @@ class NeuralIngestor:
             "_token_count": len(tokens)
         }
 
+    @traced("phase2.ingest")
     def build_diagnostic_dataframe(self, raw_text):
         if not raw_text.strip(): return pd.DataFrame()
         line_data = [self.analyze_line_composition(line) for line in raw_text.splitlines() if line.strip()]
-        return pd.DataFrame(line_data)
\ No newline at end of file
+        return pd.DataFrame(line_data)
+
+    def iter_diagnostic_frames(self, lines, chunk_lines=200000):
+        """
+        Out-of-core ingest: yields one diagnostic DataFrame per chunk_lines
+        non-blank lines of any line iterable (e.g. an open file).
+        """
+        batch = []
+        for line in lines:
+            if line.strip():
+                batch.append(self.analyze_line_composition(line.rstrip("\r\n")))
+            if len(batch) >= chunk_lines:
+                yield pd.DataFrame(batch)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch)
\ No newline at end of file
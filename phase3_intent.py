@@ -1,5 +1,7 @@
 import re
 
+from filter_expr import parse_filter
+
 class CognitiveIntentEngine:
     def __init__(self):
         self.intent_map = {
@@ -90,6 +92,9 @@ class CognitiveIntentEngine:
                 if col.lower() in text:
                     params['column'] = col
                     break
+            # 'Analyze Age, Salary' profiles several columns at once; none means all
+            if found_action == 'analyze':
+                params['columns'] = [col for col in columns if re.search(rf"\b{re.escape(col.lower())}\b", text)]
 
         # --- STANDARD OPERATIONS ---
         elif found_action == 'delete_row':
@@ -103,34 +108,80 @@ class CognitiveIntentEngine:
                     break
 
         elif found_action == 'rename':
-            match = re.search(r"rename\s+['\"]?(.+?)['\"]?\s+to\s+['\"]?(.+?)['\"]?$", text)
-            if match:
-                params['old_name'] = match.group(1)
-                params['new_name'] = match.group(2)
+            # "Rename 'Old' to 'New'" or "Rename a to b, c to d" (original case kept)
+            body = re.sub(r"(?i)^.*?\b(?:rename|change column|change header)\s+", "", user_text.strip())
+            mapping = {}
+            for old, new in re.findall(r"['\"]?([^,'\"]+?)['\"]?\s+to\s+['\"]?([^,'\"]+?)['\"]?\s*(?:,|$)", body):
+                col = next((c for c in columns if c.lower() == old.strip().lower()), None)
+                if col is not None:
+                    mapping[col] = new.strip()
+            if mapping:
+                params['mapping'] = mapping
+                params['old_name'], params['new_name'] = next(iter(mapping.items()))
 
         elif found_action == 'fill':
-            val_match = re.search(r"with\s+([\w\d\.]+)", text)
-            if val_match: params['value'] = val_match.group(1)
+            # "Fill missing in Age, Salary with median" / "... with 0" / "... forward"
+            strategy = re.search(r"\b(mean|average|median|mode|ffill|forward|previous)\b", text)
+            if strategy:
+                params['strategy'] = {'average': 'mean', 'forward': 'ffill', 'previous': 'ffill'}.get(strategy.group(1), strategy.group(1))
+            else:
+                val_match = re.search(r"(?i)with\s+['\"]?(.+?)['\"]?\s*$", user_text.strip())
+                if val_match: params['value'] = val_match.group(1)
+            params['columns'] = [col for col in columns if re.search(rf"\b{re.escape(col.lower())}\b", text)]
+            if params['columns']:
+                params['column'] = params['columns'][0]
+
+        elif found_action == 'replace':
+            # "Replace 'NY' with 'New York', 'LA' with 'Los Angeles' in City"
+            # "Replace regex '^N.*' with 'North'" treats the patterns as regular expressions
+            params['regex'] = bool(re.search(r"\b(regex|pattern)\b", text))
+            pairs = re.findall(r"['\"]([^'\"]*)['\"]\s+with\s+['\"]([^'\"]*)['\"]", user_text)
+            if not pairs:
+                match = re.search(r"(?i)replace\s+(?:regex\s+|pattern\s+)?(\S+)\s+with\s+(\S+)", user_text)
+                pairs = [match.groups()] if match else []
+            params['mapping'] = dict(pairs)
+            scope = re.search(r"\bin\s+(.+)$", text)
+            params['columns'] = [col for col in columns if scope and re.search(rf"\b{re.escape(col.lower())}\b", scope.group(1))]
+
+        elif found_action == 'sort':
+            # "Sort by Salary desc" / "Order by Age descending"
             for col in columns:
-                if col.lower() in text:
+                if re.search(rf"\b{re.escape(col.lower())}\b", text):
                     params['column'] = col
                     break
+            params['ascending'] = not re.search(r"\b(desc|descending|reverse|largest first|highest first)\b", text)
+
+        elif found_action == 'group':
+            # "Group by City sum Sales" / "Group by City, Region mean Salary" / "Summarize Sales by City"
+            aggs = {'count': 'count', 'sum': 'sum', 'total': 'sum', 'mean': 'mean', 'average': 'mean', 'avg': 'mean',
+                    'min': 'min', 'minimum': 'min', 'max': 'max', 'maximum': 'max'}
+            agg_words = "|".join(aggs)
+            agg = re.search(rf"\b({agg_words})\b", text)
+            params['agg'] = aggs[agg.group(1)] if agg else 'count'
+
+            def mentioned(scope):
+                # Columns named in scope, in the order they appear
+                hits = [(re.search(rf"\b{re.escape(col.lower())}\b", scope), col) for col in columns]
+                return [col for _, col in sorted((hit.start(), col) for hit, col in hits if hit)]
+
+            by_scope = re.search(rf"\bby\s+(.+?)(?=\s+(?:{agg_words})\b|$)", text)
+            params['by'] = mentioned(by_scope.group(1)) if by_scope else []
+            values = [col for col in mentioned(text) if col not in params['by']]
+            params['value'] = values[0] if values else None
 
         elif found_action == 'filter':
-            # Simple operators
-            if '>' in text:
-                params['operator'] = '>'
-                params['value'] = text.split('>')[1].strip()
-            elif '<' in text:
-                params['operator'] = '<'
-                params['value'] = text.split('<')[1].strip()
-            elif '=' in text:
-                params['operator'] = '=='
-                params['value'] = text.split('=')[1].strip()
-            
-            for col in columns:
-                if col.lower() in text:
-                    params['column'] = col
+            # "Filter Age >= 30 and (City in NY, LA or Name contains 'smith')"
+            body = re.sub(r"(?i)^.*?\b(?:filter|keep|show only|where)\b(?:\s+rows)?(?:\s+where)?\s*", "", user_text.strip())
+            try:
+                params['expression'] = parse_filter(body, columns)
+            except ValueError as e:
+                params['error'] = str(e)
+            else:
+                # A single comparison is also exposed the old way
+                if params['expression']['op'] == 'cmp':
+                    params['column'] = params['expression']['column']
+                    params['operator'] = params['expression']['cmp']
+                    params['value'] = params['expression']['value']
 
         return {
             "action": found_action,
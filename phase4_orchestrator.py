@@ -2,6 +2,7 @@
 JEFF v5.2: DYNAMIC AI ORCHESTRATOR
 ----------------------------------
 Role: Intelligent Schema Negotiation & Dynamic Labeling
+UPDATED: Unattended Runs (load_text + run_script, fixed repair policy)
 """
 
 import os
@@ -10,44 +11,68 @@ from phase6_materializer import DataMaterializer
 from phase7_validation import DataIntegrityValidator
 from phase9_finalize import SchemaLockMaster
 from phase10_export import ProfessionalExporter
+from monitor_view import head_tail
+from profiler import fingerprint_columns
+from data_versions import rename_columns
 
 class AnalysisOrchestrator:
-    def __init__(self, ingestor, intent_engine, action_suite):
+    def __init__(self, ingestor, intent_engine, action_suite, full_print=False, repair_policy=None):
         self.ingestor = ingestor
         self.intent_engine = intent_engine
         self.action_suite = action_suite
         self.df = None
         self.session_active = True
+        self.full_print = full_print # Print the whole table after each command (slow on big data)
+        self.repair_policy = repair_policy # None = ask during validation; 'fill'/'drop'/'keep' = don't
 
     def _dynamic_labeler(self):
         """
         AI Logic: Analyzes data values to assign probable headers 
         dynamically rather than hardcoding names.
+        Uses the column fingerprints computed during materialization.
         """
+        fingerprints = self.df.attrs.get("fingerprints")
+        if fingerprints is None:
+            fingerprints = fingerprint_columns(self.df)
+
         new_names = {}
-        for col in self.df.columns:
-            if col.startswith("text_col"):
-                sample = self.df[col].dropna().astype(str).tolist()
-                # If values look like Cities (usually one word, proper case)
-                if all(len(s.split()) == 1 for s in sample[:3]):
-                    new_names[col] = "Location"
-                # If values look like Names (usually two words)
-                elif any(len(s.split()) >= 2 for s in sample[:3]):
-                    new_names[col] = "Entity_Name"
-            
-            elif col.startswith("num_col"):
-                mean_val = self.df[col].mean()
-                # If numbers are large, likely Salary/Price
-                if mean_val > 1000:
-                    new_names[col] = "Value_Amt"
-                # If numbers are small/sequential, likely ID
-                elif mean_val < 1000:
-                    new_names[col] = "ID_Ref"
-        
+        for col, fp in fingerprints.items():
+            if col not in self.df.columns or "unique_ratio" not in fp or fp["fill_rate"] == 0:
+                continue
+            label = self._label_from_fingerprint(fp)
+            if label:
+                # Two columns with the same profile: Location, Location_2, ...
+                taken = set(new_names.values()) | set(self.df.columns)
+                name, n = label, 2
+                while name in taken:
+                    name, n = f"{label}_{n}", n + 1
+                new_names[col] = name
+
         if new_names:
             self.df = self.df.rename(columns=new_names)
+            rename_columns(self.df, new_names)
+            self.df.attrs["fingerprints"] = {new_names.get(c, c): fp for c, fp in fingerprints.items()}
             print(f"🧠 Jeff AI: Dynamically identified headers: {list(new_names.values())}")
 
+    def _label_from_fingerprint(self, fp):
+        if fp["kind"] == "text":
+            patterns = fp["patterns"]
+            if patterns["email"] > 0.8: return "Email"
+            if patterns["date"] > 0.8: return "Date"
+            if patterns["currency"] > 0.8: return "Value_Amt"
+            # Names are usually two words; cities/categories one word
+            multi_word = sum(v for k, v in fp["word_counts"].items() if k >= 2)
+            return "Entity_Name" if multi_word >= 0.5 else "Location"
+
+        # Numeric: unique integers counting up by one are IDs, large magnitudes are amounts
+        is_key = fp["integer_share"] > 0.95 and fp["unique_ratio"] > 0.95
+        if is_key and fp["unit_step_share"] > 0.9:
+            return "ID_Ref"
+        thousands = sum(v for k, v in fp["magnitudes"].items() if k >= 3)
+        if thousands >= 0.5:
+            return "Value_Amt"
+        return "ID_Ref" if is_key else "Measure"
+
     def negotiate_schema(self):
         """Automatically applies structure and runs the Dynamic Labeler."""
         engine = SchemaInferenceEngine()
@@ -61,9 +86,29 @@ class AnalysisOrchestrator:
         # Run AI Labeler (Not hardcoded!)
         self._dynamic_labeler()
         
-        DataIntegrityValidator().validate(self.df)
+        DataIntegrityValidator(self.repair_policy).validate(self.df)
         self.df = SchemaLockMaster().lock(self.df, suggested_schema)
 
+    def load_text(self, raw_text):
+        """Ingest -> schema -> materialize -> validate -> lock; prompt-free when a repair policy is set."""
+        self.df = self.ingestor.build_diagnostic_dataframe(raw_text)
+        self.negotiate_schema()
+        return self.df
+
+    def run_script(self, commands):
+        """
+        Runs commands in order without prompting.
+        Returns (messages, artifacts) for the export step.
+        """
+        messages, artifacts = [], []
+        for command in commands:
+            intent = self.intent_engine.analyze_command(command, list(self.df.columns))
+            self.df, msg, artifact = self.action_suite.execute(intent, self.df)
+            messages.append(f"{command} → {msg}")
+            if artifact:
+                artifacts.append(artifact)
+        return messages, artifacts
+
     def start_session(self):
         os.system('cls' if os.name == 'nt' else 'clear')
         print("🤖 JEFF: ANALYST READY")
@@ -91,10 +136,14 @@ class AnalysisOrchestrator:
                 intent = self.intent_engine.analyze_command(user_input, self.df)
                 if intent["action"] == "terminate": break
 
-                self.df = self.action_suite.execute(intent, self.df)
-                
-                clean_cols = [c for c in self.df.columns if not str(c).startswith('_')]
-                print("\n" + self.df[clean_cols].to_string(index=False))
+                self.df, msg, _ = self.action_suite.execute(intent, self.df)
+                print(f"\n[Jeff]: {msg}")
+
+                if self.full_print:
+                    clean_cols = [c for c in self.df.columns if not str(c).startswith('_')]
+                    print("\n" + self.df[clean_cols].to_string(index=False))
+                else:
+                    print("\n" + head_tail(self.df))
 
             except Exception as e:
                 print(f"⚠️ Error: {e}")
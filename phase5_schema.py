@@ -9,6 +9,7 @@ to ensure suggested schemas are accurate and robust.
 """
 
 import logging
+from instrumentation import traced
 
 class SchemaInferenceEngine:
     def __init__(self):
@@ -16,6 +17,7 @@ class SchemaInferenceEngine:
         self.MIN_CONFIDENCE = 0.5  # 50% fill rate required to suggest a column
         self.LABEL_MAX_LEN = 3     # Strings shorter than this are treated as junk labels
 
+    @traced("phase5.infer")
     def infer(self, df):
         """
         Scans the Diagnostic DataFrame and returns a list of suggested columns.
@@ -10,25 +10,35 @@ IndexErrors through defensive boundary checking.
 
 import pandas as pd
 import logging
+from sketches import SKETCH_BOOK, SketchAccumulator, build_sketches
+from profiler import fingerprint_columns
+from instrumentation import traced
+from column_parallel import COLUMN_EXECUTOR
+
+def extract_items(task):
+    """
+    Column task for the ColumnExecutor: (list cells, index) -> (values,
+    error count). Module-level so it can run in a worker process.
+    """
+    cells, index = task
+    values, errors = [], 0
+    for cell in cells:
+        try:
+            values.append(cell[index] if index < len(cell) else None)
+        except Exception:
+            errors += 1
+            values.append(None)
+    return values, errors
 
 class DataMaterializer:
-    def __init__(self):
+    def __init__(self, sketch_rows=1000000, executor=None):
         self.error_count = 0
+        # Frames at least this long get approximate-statistics sketches (0 = always)
+        self.sketch_rows = sketch_rows
+        # Runs the per-column extraction tasks (see column_parallel)
+        self.executor = executor or COLUMN_EXECUTOR
 
-    def _safe_extract(self, row, key, index):
-        """
-        Safely retrieves a value from a list within a row.
-        If the index is out of bounds, it returns None instead of crashing.
-        """
-        try:
-            target_list = row[key]
-            if index < len(target_list):
-                return target_list[index]
-            return None
-        except Exception as e:
-            self.error_count += 1
-            return None
-
+    @traced("phase6.materialize")
     def materialize(self, df, schema):
         """
         Physically creates new columns in the DataFrame based on the schema.
@@ -41,11 +51,62 @@ class DataMaterializer:
             logging.info("Materializer: No schema provided. Skipping transformation.")
             return df
 
+        print(f"\n[Jeff]: 🏗️  Materializing {len(schema)} columns...")
+        materialized_df = self._extract_columns(df, schema)
+
+        if self.error_count > 0:
+            print(f"ℹ️ Jeff: Materialization complete with {self.error_count} boundary adjustments.")
+        
+        # Reorder: Put the new columns at the front, keep hidden columns at the back
+        new_cols = [s["name"] for s in schema]
+        internal_cols = [c for c in materialized_df.columns if c.startswith("_")]
+        result = materialized_df[new_cols + internal_cols]
+
+        # Column fingerprints for the Orchestrator's labeler (plain dicts in attrs)
+        result.attrs["fingerprints"] = fingerprint_columns(result, new_cols)
+
+        # Sketch the new columns while the data is hot; analyze/plot reuse them
+        if len(result) >= self.sketch_rows:
+            SKETCH_BOOK.register(result, build_sketches(result, new_cols))
+
+        return result
+
+    @traced("phase6.materialize_chunked")
+    def materialize_chunked(self, frames, schema, path):
+        """
+        Out-of-core variant: every diagnostic frame from Phase 2's
+        iter_diagnostic_frames() becomes one row group of user-facing
+        columns in the Parquet file at path. Only one chunk is in memory
+        at a time; sketches and fingerprints are built along the way.
+
+        Returns a ChunkedFrame.
+        """
+        from chunked_frame import write_chunks
+
+        new_cols = [s["name"] for s in schema]
+        sketches = SketchAccumulator(new_cols)
+        fingerprints = {}
+
+        def chunks():
+            for frame in frames:
+                part = self._extract_columns(frame, schema)[new_cols]
+                if not fingerprints:
+                    fingerprints.update(fingerprint_columns(part, new_cols)) # First chunk as the sample
+                sketches.update(part)
+                yield part
+
+        print(f"\n[Jeff]: 🏗️  Materializing {len(schema)} columns out-of-core...")
+        result = write_chunks(chunks(), path)
+        result.attrs["fingerprints"] = fingerprints
+        SKETCH_BOOK.register(result, sketches.sketches)
+        print(f"[Jeff]: 💾 {len(result)} rows in {result.num_row_groups} row groups at {path}")
+        return result
+
+    def _extract_columns(self, df, schema):
         # Work on a copy to preserve original diagnostic data
         materialized_df = df.copy()
 
-        print(f"\n[Jeff]: 🏗️  Materializing {len(schema)} columns...")
-
+        tasks = []
         for col_blueprint in schema:
             col_name = col_blueprint["name"]
             source_info = col_blueprint["source"] # Example: "_strings[0]"
@@ -55,25 +116,18 @@ class DataMaterializer:
             try:
                 list_key = "_" + source_info.split("[")[0].split("_")[1]
                 idx = int(source_info.split("[")[1].split("]")[0])
-                
-                # Apply safe extraction to every row
-                materialized_df[col_name] = materialized_df.apply(
-                    lambda row: self._safe_extract(row, list_key, idx), 
-                    axis=1
-                )
-                
+                tasks.append((col_name, materialized_df[list_key], idx))
             except Exception as e:
                 print(f"⚠️ Materializer Error on column '{col_name}': {e}")
                 logging.error(f"Mapping error for {col_name}: {e}")
 
-        if self.error_count > 0:
-            print(f"ℹ️ Jeff: Materialization complete with {self.error_count} boundary adjustments.")
-        
-        # Reorder: Put the new columns at the front, keep hidden columns at the back
-        new_cols = [s["name"] for s in schema]
-        internal_cols = [c for c in materialized_df.columns if c.startswith("_")]
-        
-        return materialized_df[new_cols + internal_cols]
+        # Safe extraction for every column at once; columns are independent
+        results = self.executor.map(extract_items, [(cells.tolist(), idx) for _, cells, idx in tasks], pure_python=True)
+        for (col_name, cells, _), (values, errors) in zip(tasks, results):
+            self.error_count += errors
+            materialized_df[col_name] = pd.Series(values, index=materialized_df.index)
+
+        return materialized_df
 
 # Logic Check for Phase 4:
 # The Orchestrator calls: self.df = DataMaterializer().materialize(self.df, schema)
\ No newline at end of file
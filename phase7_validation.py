@@ -6,19 +6,43 @@ Role: Quality Assurance & Data Auditing
 This module performs a deep-scan of the materialized DataFrame.
 It identifies 'dirty data'—missing values, mixed types, and structural
 anomalies—before the Execution Suite (Phase 8) begins analysis.
+
+UPDATED: Fixed Repair Policies ('fill' / 'drop' / 'keep') for Unattended Runs
+UPDATED: Column-Parallel Audit (see column_parallel)
 """
 
 import pandas as pd
 import logging
+from data_versions import touch_columns
+from instrumentation import traced
+from column_parallel import COLUMN_EXECUTOR
+
+REPAIR_POLICIES = {"fill": "1", "drop": "2", "keep": "3"}
+
+def audit_column(series):
+    """
+    Column task: (missing count, distinct Python types of the present
+    values). Module-level so it can run in a worker process.
+    """
+    return int(series.isna().sum()), series.dropna().map(type).unique()
+
+def _fill_hole(series):
+    return series.fillna(0) if pd.api.types.is_numeric_dtype(series) else series.fillna("Unknown")
 
 class DataIntegrityValidator:
-    def __init__(self):
+    def __init__(self, repair_policy=None, executor=None):
+        # None asks the user; 'fill', 'drop' or 'keep' answers without prompting
+        if repair_policy is not None and repair_policy not in REPAIR_POLICIES:
+            raise ValueError(f"Unknown repair policy '{repair_policy}'. Use one of {list(REPAIR_POLICIES)}.")
+        self.repair_policy = repair_policy
+        self.executor = executor or COLUMN_EXECUTOR
         self.validation_report = {
             "missing_data": {},
             "type_mismatch": [],
             "status": "Incomplete"
         }
 
+    @traced("phase7.validate")
     def validate(self, df):
         """
         Runs a multi-point audit on the structured columns.
@@ -34,9 +58,12 @@ class DataIntegrityValidator:
         print("PHASE 7: INTEGRITY AUDIT START")
         print("🔍" * 15)
 
+        # Both checks for every column in one parallel pass; reported in column order
+        audits = dict(zip(target_cols, self.executor.map(audit_column, [df[col] for col in target_cols], pure_python=True)))
+
         # 1. Null Value Detection (The 'Swiss Cheese' Check)
         for col in target_cols:
-            null_count = df[col].isna().sum()
+            null_count = audits[col][0]
             if null_count > 0:
                 self.validation_report["missing_data"][col] = null_count
                 percentage = (null_count / len(df)) * 100
@@ -46,7 +73,7 @@ class DataIntegrityValidator:
         # Ensures that a 'Numeric' column doesn't accidentally contain strings
         for col in target_cols:
             # Check the unique types in the column
-            types = df[col].dropna().map(type).unique()
+            types = audits[col][1]
             if len(types) > 1:
                 self.validation_report["type_mismatch"].append(col)
                 print(f"📍 Column '{col}': Mixed data types detected {types}. This may cause errors in math.")
@@ -69,20 +96,24 @@ class DataIntegrityValidator:
         print("2. Drop rows containing missing data")
         print("3. Leave them as they are (None/NaN)")
         
-        choice = input("\nHow should I proceed? (1/2/3) → ").strip()
+        if self.repair_policy:
+            choice = REPAIR_POLICIES[self.repair_policy]
+            print(f"\n[Jeff]: Applying repair policy '{self.repair_policy}' (option {choice}).")
+        else:
+            choice = input("\nHow should I proceed? (1/2/3) → ").strip()
 
         if choice == "1":
-            for col in target_cols:
-                if df[col].dtype == 'object':
-                    df[col] = df[col].fillna("Unknown")
-                else:
-                    df[col] = df[col].fillna(0)
+            holes = list(self.validation_report["missing_data"])
+            for col, filled in zip(holes, self.executor.map(_fill_hole, [df[col] for col in holes])):
+                df[col] = filled
+            touch_columns(df, holes)
             print("✨ Jeff: Missing values filled.")
             
         elif choice == "2":
             before = len(df)
             df.dropna(subset=target_cols, inplace=True)
             after = len(df)
+            touch_columns(df)
             print(f"✨ Jeff: Removed {before - after} rows containing errors.")
             
         else:
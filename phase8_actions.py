@@ -1,18 +1,58 @@
 import pandas as pd
-import streamlit as st
-import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
+from data_versions import column_version, touch_columns, rename_columns
+from plot_engine import PlotEngine
+from profiler import StatProfiler
+from sketches import SKETCH_BOOK, sketch_report
+from row_hashes import RowHashIndex
+from filter_expr import filter_mask, describe
+from instrumentation import TRACER
+from sql_backend import SqlFallback, make_backend
+from chunked_frame import ChunkedFrame, filter_chunks, dedupe_chunks, group_chunks, group_partial, group_finish
+
+# matplotlib is imported inside PlotEngine, so loading the suite (and every
+# cold start) stays cheap. The suite never calls Streamlit: the app renders
+# the returned artifacts, so actions can run on worker threads and in batch.
 
 class ExecutionActionSuite:
+    def __init__(self, approximate=None, approx_rows=1000000, backend="pandas", threads=None):
+        self.plotter = PlotEngine()
+        self.profiler = StatProfiler()
+        self.row_index = RowHashIndex()
+        # Sketch-based answers: True/False forces the mode, None = auto by size
+        self.approximate = approximate
+        self.approx_rows = approx_rows
+        # 'duckdb' runs filter/sort/group/dedupe/analyze as SQL (None if not installed)
+        self.sql = make_backend(backend, threads)
+
+    def _use_sketches(self, df):
+        if isinstance(df, ChunkedFrame):
+            return True # Out-of-core: the sketches from materialization are the only full pass
+        if self.approximate is None:
+            return len(df) >= self.approx_rows
+        return self.approximate
+
     def execute(self, intent, df):
         """
         Returns:
             df: Modified DataFrame
             msg: Status message
             artifact: Dictionary {'type': 'text'|'plot', 'content': ..., 'filename': ...} 
-                      to be used for file downloads.
+                      to be used for file downloads. Plot content is PNG bytes.
         """
+        if not TRACER.active:
+            return self._execute(intent, df)
+        with TRACER.span(f"action.{intent['action']}", len(df)) as span:
+            result = self._execute(intent, df)
+            span.rows_out = len(result[0])
+        return result
+
+    def _execute(self, intent, df):
+        if isinstance(df, ChunkedFrame):
+            return self._execute_chunked(intent, df)
+        return self._run_action(intent, df)
+
+    def _run_action(self, intent, df):
         action = intent['action']
         params = intent['parameters']
         msg = "Action completed."
@@ -24,6 +64,8 @@ class ExecutionActionSuite:
                 col = params.get('column')
                 if col and col not in df.columns:
                     df[col] = pd.NA # Initialize with empty values
+                    touch_columns(df, [col])
+                    self.row_index.invalidate(df) # Row hashes cover the old column set
                     msg = f"Added new column '{col}'."
                 elif col in df.columns:
                     msg = f"Column '{col}' already exists."
@@ -33,7 +75,14 @@ class ExecutionActionSuite:
             elif action == 'add_row':
                 # Append an empty row with the same index logic
                 new_idx = len(df)
-                df.loc[new_idx] = [pd.NA] * len(df.columns)
+                old_versions = dict(df.attrs.get('col_versions', {}))
+                saved_hashes = self.row_index.detach(df)
+                # NaN (not pd.NA) keeps numeric columns numeric
+                df.loc[new_idx] = [np.nan] * len(df.columns)
+                self.row_index.reattach(df, saved_hashes) # Hash only the new row
+                touch_columns(df)
+                # Fold the new row into cached stats instead of rescanning
+                self.profiler.append(df, old_versions, new_idx)
                 msg = f"Added new empty row at index {new_idx}."
 
             # --- 2. EDITING (Fixed Update Logic) ---
@@ -53,6 +102,8 @@ class ExecutionActionSuite:
                         except: pass 
                         
                         df.at[idx, col] = val
+                        touch_columns(df, [col])
+                        self.row_index.refresh(df, [idx])
                         msg = f"Updated Row {idx}, Column '{col}' to '{val}'"
                     else:
                         msg = f"Row index {idx} not found."
@@ -65,98 +116,157 @@ class ExecutionActionSuite:
                     if id_col:
                         mask = df[id_col] == id_val
                         df.loc[mask, col] = val
+                        touch_columns(df, [col])
+                        self.row_index.refresh(df, df.index[mask])
                         msg = f"Updated '{col}' to '{val}' where {id_col} is {id_val}"
                     else:
                         msg = "No 'ID' column found to update by."
 
-            # --- 3. DEDUPE (Fixed Logic) ---
+            # --- 2b. CLEANING (Vectorized Fill/Replace, metadata-only Rename) ---
+            elif action == 'fill':
+                named = params.get('columns')
+                cols = named or [c for c in df.columns if not str(c).startswith('_')]
+                df, changed, skipped = self._fill(df, cols, params.get('strategy'), params.get('value'), strict=not named)
+                filled_cols = [c for c in cols if c not in skipped]
+                msg = f"Filled {changed} missing values in {', '.join(filled_cols) or 'no columns'}."
+                if skipped:
+                    msg += (f" Skipped {', '.join(skipped)}: '{params.get('value')}' does not fit their type"
+                            f" (name a column to fill it anyway).")
+
+            elif action == 'replace':
+                mapping = params.get('mapping')
+                cols = params.get('columns') or [c for c in df.columns if not str(c).startswith('_')]
+                if mapping:
+                    df, changed = self._replace(df, cols, mapping, params.get('regex', False))
+                    msg = f"Replaced {changed} values in {', '.join(cols)}."
+                else:
+                    msg = "Nothing to replace. Try: Replace 'NY' with 'New York'"
+
+            elif action == 'rename':
+                mapping = params.get('mapping') or {}
+                if not mapping and params.get('old_name') in df.columns:
+                    mapping = {params['old_name']: params['new_name']}
+                renamed = [mapping.get(c, c) for c in df.columns]
+                taken = sorted({str(n) for n in renamed if renamed.count(n) > 1})
+                hidden = [str(n) for o, n in mapping.items() if o in df.columns and str(n).startswith('_')]
+                if taken:
+                    msg = f"Error: Column name {', '.join(repr(n) for n in taken)} is already in use. Pick another name."
+                elif hidden:
+                    msg = f"Error: Column names starting with '_' are reserved for internal columns ({', '.join(repr(n) for n in hidden)})."
+                elif mapping:
+                    # Only the column labels change; no data is copied
+                    df.rename(columns=mapping, inplace=True)
+                    rename_columns(df, mapping)
+                    msg = "Renamed " + ", ".join(f"'{o}' to '{n}'" for o, n in mapping.items()) + "."
+                else:
+                    msg = "Column to rename not found."
+
+            # --- 3. DEDUPE (Row-hash index) ---
             elif action == 'dedupe':
                 col = params.get('column')
                 before = len(df)
+                rows = self._via_sql("first_rows", df, [col] if col else None)
+                if rows is not None:
+                    df = df.iloc[rows] # SQL found the first occurrences
+                else:
+                    # Only rows added/edited since the last dedupe on this key are checked
+                    df = df[~self.row_index.duplicated(df, [col] if col else None).to_numpy()]
+                self.row_index.mark_clean(df, [col] if col else None)
                 if col:
-                    # Dedupe based on specific subset
-                    df = df.drop_duplicates(subset=[col])
                     msg = f"Removed duplicates based on column '{col}'. ({before - len(df)} removed)"
                 else:
-                    # Dedupe identical rows
-                    df = df.drop_duplicates()
                     msg = f"Removed identical rows. ({before - len(df)} removed)"
+                if len(df) != before:
+                    touch_columns(df)
 
             # --- 4. DATA OPS (Filter, Sort, Group) ---
             elif action == 'filter':
-                col = params.get('column')
-                op = params.get('operator')
-                val = params.get('value')
-                if col and op and val:
-                    try: val = float(val)
-                    except: pass
-                    
-                    if op == '>': df = df[df[col] > val]
-                    elif op == '<': df = df[df[col] < val]
-                    elif op == '==': df = df[df[col] == val]
-                    msg = f"Filtered {col} {op} {val}. Remaining: {len(df)}"
+                tree = self._filter_tree(params)
+                if tree is not None:
+                    # Whole expression -> one mask (or SQL row positions) -> one copy of the frame
+                    rows = self._via_sql("filter_rows", df, tree)
+                    df = df.iloc[rows] if rows is not None else df[filter_mask(df, tree)]
+                    touch_columns(df)
+                    msg = f"Filtered {describe(tree)}. Remaining: {len(df)}"
+                elif params.get('error'):
+                    msg = f"Error: {params['error']}"
 
             elif action == 'sort':
                 col = params.get('column')
                 asc = params.get('ascending', True)
                 if col:
-                    df = df.sort_values(by=col, ascending=asc)
+                    rows = self._via_sql("sort_rows", df, col, asc)
+                    # Stable, so both backends agree on ties
+                    df = df.iloc[rows] if rows is not None else df.sort_values(by=col, ascending=asc, kind="stable")
                     msg = f"Sorted by '{col}'."
 
+            elif action == 'group':
+                by = params.get('by')
+                if by:
+                    agg, value = params.get('agg', 'count'), params.get('value')
+                    out = self._via_sql("group", df, by, agg, value)
+                    # Same partial/finish steps as the out-of-core path, over one chunk
+                    df = out if out is not None else group_finish(group_partial(df, by, value), by, agg, value)
+                    touch_columns(df)
+                    msg = self._group_msg(by, agg, value, len(df))
+                else:
+                    msg = "Group by which column? Try: Group by City sum Sales"
+
             elif action == 'delete_row':
                 idx = params.get('index')
                 if idx is not None and idx in df.index:
                     df = df.drop(idx).reset_index(drop=True)
+                    touch_columns(df)
                     msg = f"Deleted Row {idx}."
 
             elif action == 'delete_col':
                 col = params.get('column')
                 if col in df.columns:
                     df = df.drop(columns=[col])
+                    touch_columns(df, [])
+                    self.row_index.invalidate(df)
                     msg = f"Deleted Column '{col}'."
 
-            # --- 5. ANALYSIS (Fixed: Returns Text for File) ---
+            # --- 5. ANALYSIS (Cached multi-column profile, Returns Text for File) ---
             elif action == 'analyze':
-                col = params.get('column')
-                if col:
-                    if pd.api.types.is_numeric_dtype(df[col]):
-                        desc = df[col].describe()
-                        stats_str = desc.to_string()
-                        
-                        msg = f"Analyzed {col}."
-                        # Display on screen
-                        st.text(f"--- Analysis: {col} ---\n{stats_str}")
-                        
-                        # Save to artifact for download
-                        artifact = {
-                            'type': 'text',
-                            'content': f"ANALYSIS REPORT FOR '{col}':\n{stats_str}\n\n",
-                            'filename': f"analysis_{col}.txt"
-                        }
-                    else:
-                        msg = f"Column '{col}' is not numeric."
+                if 'columns' in params:
+                    cols = params['columns'] or None # Empty list: profile every column
+                else:
+                    cols = [params['column']] if params.get('column') else None
+                if self._use_sketches(df):
+                    profiles = SKETCH_BOOK.get(df, cols or [c for c in df.columns if not str(c).startswith('_')])
+                    stats_str = sketch_report(profiles)
+                else:
+                    profiles = self.profiler.profile(df, cols, compute=self._sql_profiles if self.sql else None)
+                    stats_str = self.profiler.report(profiles)
+                if profiles:
+                    label = ", ".join(profiles)
 
-            # --- 6. PLOTTING (Fixed: Returns Image for File) ---
+                    msg = f"Analyzed {label}."
+
+                    # Save to artifact for download
+                    artifact = {
+                        'type': 'text',
+                        'content': f"ANALYSIS REPORT FOR '{label}':\n{stats_str}\n\n",
+                        'filename': f"analysis_{'_'.join(map(str, profiles))[:60]}.txt"
+                    }
+                else:
+                    msg = "No columns to analyze."
+
+            # --- 6. PLOTTING (Binned, Agg-rendered PNG bytes) ---
             elif action == 'plot':
                 col = params.get('column')
                 if col:
-                    fig, ax = plt.subplots(figsize=(10, 5))
-                    plt.style.use('dark_background')
-                    
-                    if pd.api.types.is_numeric_dtype(df[col]):
-                        sns.histplot(df[col], kde=True, ax=ax, color='#00ff41')
-                        ax.set_title(f"Distribution of {col}")
+                    version = column_version(df, col)
+                    if self._use_sketches(df):
+                        sketch = SKETCH_BOOK.get(df, [col])[col]
+                        png, _ = self.plotter.render_sketch(sketch, col, version)
                     else:
-                        counts = df[col].value_counts().head(10)
-                        sns.barplot(x=counts.index, y=counts.values, ax=ax, palette='viridis')
-                        ax.set_title(f"Count of {col}")
-                    
-                    st.pyplot(fig) # Show on Monitor
-                    
-                    # Return Figure for Download
+                        png, _ = self.plotter.render(df[col], col, version)
+                    # Return PNG bytes for Download (no live Figure kept around)
                     artifact = {
                         'type': 'plot',
-                        'content': fig,
+                        'content': png,
                         'filename': f"plot_{col}.png"
                     }
                     msg = f"Plot generated for '{col}'."
@@ -165,3 +275,167 @@ class ExecutionActionSuite:
             msg = f"Error: {str(e)}"
             
         return df, msg, artifact
+
+    def _execute_chunked(self, intent, frame):
+        """
+        Out-of-core actions on a ChunkedFrame. filter and dedupe stream into
+        a new file, group merges per-chunk partial aggregates, analyze and
+        plot use the sketches (see _use_sketches). Other actions need the
+        whole frame in memory, so they only run if it has under approx_rows rows.
+        """
+        action = intent['action']
+        params = intent['parameters']
+        try:
+            if action == 'filter':
+                tree = self._filter_tree(params)
+                if tree is None:
+                    return frame, f"Error: {params.get('error', 'No filter expression.')}", None
+                out = filter_chunks(frame, tree)
+                return out, f"Filtered {describe(tree)}. Remaining: {len(out)} (out-of-core)", None
+
+            if action == 'dedupe':
+                col = params.get('column')
+                out = dedupe_chunks(frame, [col] if col else None)
+                basis = f"based on column '{col}'" if col else "identical rows"
+                # Matched by 64-bit hash only (see dedupe_chunks); say so
+                return out, (f"Removed duplicates, {basis}. ({len(frame) - len(out)} removed, out-of-core;"
+                             f" matched by row hash, a collision can drop a distinct row)"), None
+
+            if action == 'group':
+                by = params.get('by')
+                if not by:
+                    return frame, "Group by which column? Try: Group by City sum Sales", None
+                agg, value = params.get('agg', 'count'), params.get('value')
+                out = group_chunks(frame, by, agg, value)
+                touch_columns(out)
+                return out, self._group_msg(by, agg, value, len(out)), None
+        except Exception as e:
+            return frame, f"Error: {str(e)}", None
+
+        if action in ('analyze', 'plot'):
+            return self._run_action(intent, frame)
+        if len(frame) < self.approx_rows:
+            return self._run_action(intent, frame.to_pandas())
+        return frame, f"Error: '{action}' needs the whole frame in memory ({len(frame)} rows). Filter or group it first.", None
+
+    def _via_sql(self, method, *args):
+        """
+        Runs a SQL backend method. None means "use pandas": no backend, or
+        it cannot express this action.
+        """
+        if self.sql is None:
+            return None
+        try:
+            return getattr(self.sql, method)(*args)
+        except SqlFallback:
+            return None
+
+    def _sql_profiles(self, df, numeric, text):
+        return self._via_sql("profile_columns", df, numeric, text, self.profiler.top_n)
+
+    def _filter_tree(self, params):
+        tree = params.get('expression')
+        if tree is None and params.get('column') and params.get('operator'):
+            # Old single-predicate form: {'column', 'operator', 'value'}
+            op = '==' if params['operator'] == '=' else params['operator']
+            tree = {'op': 'cmp', 'column': params['column'], 'cmp': op, 'value': params.get('value')}
+        return tree
+
+    def _group_msg(self, by, agg, value, groups):
+        what = f"{agg} of '{value}'" if value else "row count"
+        return f"Grouped by {', '.join(by)}: {what}. {groups} groups."
+
+    def _fill(self, df, cols, strategy, value, strict=True):
+        """
+        Fills nulls in all cols with one vectorized call. Returns (df, count,
+        skipped). strict: a constant only goes into columns whose type it
+        fits; skipped lists the ones with holes it left alone.
+        """
+        block = df[cols]
+        holes = block.isna()
+        skipped = []
+        if strategy in ('mean', 'median'):
+            numeric = [c for c in cols if pd.api.types.is_numeric_dtype(block[c])]
+            filled = block.fillna(getattr(block[numeric], strategy)())
+        elif strategy == 'mode':
+            modes = block.mode()
+            filled = block.fillna(modes.iloc[0] if len(modes) else {})
+        elif strategy == 'ffill':
+            filled = block.ffill()
+        elif value is not None:
+            # Numbers go into numeric columns as numbers, dates as timestamps, text stays text
+            fill_map = {}
+            for c in cols:
+                typed = self._constant_for(block[c], value)
+                if typed is not None:
+                    fill_map[c] = typed
+                elif not strict:
+                    fill_map[c] = value # Named explicitly: the user asked for exactly this
+                elif holes[c].any():
+                    skipped.append(c)
+            filled = block.fillna(fill_map)
+        else:
+            return df, 0, skipped
+
+        diff = holes & filled.notna()
+        changed = int(diff.to_numpy().sum())
+        if changed:
+            self._commit_block(df, filled, diff)
+        return df, changed, skipped
+
+    def _constant_for(self, series, value):
+        """value converted to the dtype of series, or None if it does not fit."""
+        dtype = series.dtype
+        if pd.api.types.is_bool_dtype(dtype):
+            return {'true': True, 'yes': True, 'false': False, 'no': False}.get(str(value).strip().lower())
+        if pd.api.types.is_numeric_dtype(dtype):
+            try: number = float(value)
+            except (TypeError, ValueError): return None
+            if pd.api.types.is_integer_dtype(dtype):
+                return int(number) if number.is_integer() else None
+            return number
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            try: stamp = pd.to_datetime(value)
+            except (TypeError, ValueError): return None
+            if pd.isna(stamp):
+                return None
+            tz = getattr(dtype, 'tz', None)
+            if tz is not None:
+                stamp = stamp.tz_localize(tz) if stamp.tz is None else stamp.tz_convert(tz)
+            elif stamp.tz is not None:
+                return None
+            return stamp
+        if isinstance(dtype, pd.CategoricalDtype):
+            return value if value in dtype.categories else None
+        if pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+            return value
+        return None
+
+    def _replace(self, df, cols, mapping, regex):
+        """
+        Applies the whole mapping across all cols in one pass. Returns (df, count).
+        """
+        block = df[cols]
+        mapping = dict(mapping)
+        if not regex:
+            # '0' -> '5' should also hit numeric cells
+            for old, new in list(mapping.items()):
+                try: mapping[float(old)] = float(new)
+                except (TypeError, ValueError): pass
+        replaced = block.replace(mapping, regex=regex)
+
+        diff = replaced.ne(block) & ~(replaced.isna() & block.isna())
+        changed = int(diff.to_numpy().sum())
+        if changed:
+            self._commit_block(df, replaced, diff)
+        return df, changed
+
+    def _commit_block(self, df, block, diff):
+        """
+        Writes back only the columns where diff (cell changed) has a True,
+        so untouched columns keep their version tokens and cached stats.
+        """
+        changed_cols = [c for c, hit in diff.any().items() if hit]
+        df[changed_cols] = block[changed_cols]
+        touch_columns(df, changed_cols)
+        self.row_index.refresh(df, df.index[diff.any(axis=1).to_numpy()])
@@ -6,16 +6,24 @@ Role: State Locking & Metadata Commitment
 This module ensures that the final structured DataFrame is 
 sanitized and ready for the Exporter. it 'Locks' the column 
 definitions and prepares a summary of the analysis session.
+
+UPDATED: Persistent Snapshots (snapshot_dir= writes the locked frame to
+disk so a session can be resumed without phases 2-9; see snapshot_store)
 """
 
 import pandas as pd
 import logging
+import uuid
 from datetime import datetime
+from instrumentation import traced
 
 class SchemaLockMaster:
-    def __init__(self):
+    def __init__(self, snapshot_dir=None):
         self.timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        # Root directory for resumable snapshots (None = don't persist)
+        self.snapshot_dir = snapshot_dir
 
+    @traced("phase9.lock")
     def lock(self, df, schema):
         """
         Finalizes the DataFrame state by verifying columns and 
@@ -42,7 +50,8 @@ class SchemaLockMaster:
             # 2. Metadata Attachment
             # We attach commercial metadata directly to the DataFrame object.
             # This 'travels' with the data into the exporter.
-            df.attrs["session_id"] = f"JEFF-ANALYSIS-{int(datetime.now().timestamp())}"
+            # The suffix keeps ids (and snapshot directories) unique within a second
+            df.attrs["session_id"] = f"JEFF-ANALYSIS-{int(datetime.now().timestamp())}-{uuid.uuid4().hex[:6]}"
             df.attrs["final_schema"] = schema
             df.attrs["lock_time"] = self.timestamp
             df.attrs["status"] = "COMMERCIAL_READY"
@@ -55,11 +64,28 @@ class SchemaLockMaster:
             print(f"🛠️ System Version: Jeff v5.0 Neural")
             print("✅ Jeff: State committed. Data is secure.")
 
+            # 4. Snapshot (in-memory frames only; out-of-core data already lives on disk)
+            if self.snapshot_dir and isinstance(df, pd.DataFrame):
+                self._snapshot(df)
+
         except Exception as e:
             print(f"⚠️ Finalization Error: {str(e)}")
             logging.error(f"Finalization Failure: {e}")
 
         return df
 
+    def _snapshot(self, df):
+        from snapshot_store import write_snapshot
+
+        try:
+            df.attrs["snapshot_id"] = df.attrs["session_id"]
+            path = write_snapshot(df, self.snapshot_dir)
+            print(f"💾 Jeff: Snapshot saved to {path}")
+        except Exception as e:
+            # Mixed-type object columns cannot be written as Arrow; the session still works
+            df.attrs.pop("snapshot_id", None)
+            print(f"⚠️ Snapshot skipped: {e}")
+            logging.warning(f"Snapshot Failure: {e}")
+
 # Orchestrator Integration:
 # self.df = SchemaLockMaster().lock(self.df, suggested_schema)
\ No newline at end of file
@@ -0,0 +1,138 @@
+"""
+JEFF v6.6: PLOT ENGINE
+----------------------
+Role: Scalable Rendering of Plot Artifacts
+
+Large series are reduced with NumPy before anything is drawn:
+numeric columns become a fixed number of histogram bins (with a
+smoothed density line instead of a per-point KDE) and text columns
+become their top categories. Figures are drawn on the Agg canvas
+without pyplot, returned as PNG bytes and cached by
+(column, plot type, column version). The dark theme is set on each
+Figure and Axes directly; matplotlib's global rcParams are never
+touched, so sessions can render concurrently.
+"""
+
+import io
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Dark theme colors, applied per figure (no global style context)
+BACKGROUND = "black"
+FOREGROUND = "white"
+
+class PlotEngine:
+    def __init__(self, max_bins=50, top_n=10, cache_size=32):
+        self.max_bins = max_bins
+        self.top_n = top_n
+        self.cache_size = cache_size
+        self._cache = OrderedDict() # (column, kind, version) -> PNG bytes
+        self._lock = threading.Lock()
+
+    def render(self, series, col, version):
+        """
+        Returns (png_bytes, kind) for one column, reusing a cached render
+        when the column has not changed.
+        """
+        kind = "hist" if pd.api.types.is_numeric_dtype(series) else "bar"
+        key = (col, kind, version)
+
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key], kind
+
+        if kind == "hist":
+            png = self._draw_hist(*self._bin(series), col)
+        else:
+            counts = series.value_counts().head(self.top_n)
+            png = self._draw_bar(counts, col)
+
+        with self._lock:
+            self._cache[key] = png
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return png, kind
+
+    def render_sketch(self, sketch, col, version):
+        """
+        Same as render(), drawn from a ColumnSketch instead of the raw column:
+        weighted quantile-sketch items for numbers, top-k counts for text.
+        """
+        kind = "hist~" if sketch.numeric else "bar~"
+        key = (col, kind, version)
+
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key], kind
+
+        if sketch.numeric:
+            items, weights = sketch.quantiles.weighted_items()
+            png = self._draw_hist(*self._bin(pd.Series(items), weights), col)
+        else:
+            png = self._draw_bar(sketch.topk.top(self.top_n), col)
+
+        with self._lock:
+            self._cache[key] = png
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return png, kind
+
+    # --- DATA REDUCTION ---
+    def _bin(self, series, weights=None):
+        values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        finite = np.isfinite(values)
+        values = values[finite]
+        if values.size == 0:
+            return np.zeros(1), np.array([0.0, 1.0]), np.zeros(1)
+
+        weights = None if weights is None else np.asarray(weights)[finite]
+        n = values.size if weights is None else weights.sum()
+        bins = int(min(self.max_bins, max(np.sqrt(n), 1)))
+        counts, edges = np.histogram(values, bins=bins, weights=weights)
+
+        # Gaussian-smoothed counts stand in for a KDE over every point
+        kernel = np.exp(-0.5 * np.linspace(-2, 2, 5) ** 2)
+        if counts.size < kernel.size:
+            return counts, edges, counts.astype(float)
+        density = np.convolve(counts, kernel / kernel.sum(), mode="same")
+        return counts, edges, density
+
+    # --- DRAWING (Agg canvas, no pyplot state) ---
+    def _figure(self):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        fig = Figure(figsize=(10, 5), facecolor=BACKGROUND)
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot(facecolor=BACKGROUND)
+        for spine in ax.spines.values():
+            spine.set_color(FOREGROUND)
+        ax.tick_params(colors=FOREGROUND)
+        return fig, ax
+
+    def _to_png(self, fig):
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png")
+        return buffer.getvalue()
+
+    def _draw_hist(self, counts, edges, density, col):
+        fig, ax = self._figure()
+        ax.bar(edges[:-1], counts, width=np.diff(edges), align="edge",
+               color="#00ff41", alpha=0.6, edgecolor="#0b0e11")
+        ax.plot((edges[:-1] + edges[1:]) / 2, density, color="#00ff41")
+        ax.set_title(f"Distribution of {col}", color=FOREGROUND)
+        return self._to_png(fig)
+
+    def _draw_bar(self, counts, col):
+        import matplotlib
+
+        fig, ax = self._figure()
+        colors = matplotlib.colormaps["viridis"](np.linspace(0, 1, max(len(counts), 1)))
+        ax.bar([str(i) for i in counts.index], counts.to_numpy(), color=colors)
+        ax.set_title(f"Count of {col}", color=FOREGROUND)
+        return self._to_png(fig)
@@ -0,0 +1,258 @@
+"""
+JEFF v6.9: STATISTICAL PROFILER
+-------------------------------
+Role: Cached, Multi-Column Describe for 'analyze' & Column Fingerprints
+
+All uncached numeric columns are profiled together in one vectorized
+block (count, mean, std, min, quartiles, max); text columns get count,
+distinct count and top values. Results are cached per column version
+token (see data_versions), so analyzing an unchanged column again is
+free. Appended rows are folded into the cached moments instead of
+rescanning the column.
+
+fingerprint_columns() summarizes what a column looks like (order,
+uniqueness, word counts, magnitudes, email/date/currency patterns) so
+the Orchestrator's labeler can name columns from the whole column
+instead of a three-value sample.
+
+Text profiles and fingerprints are per-column and independent; they run
+on the shared ColumnExecutor (see column_parallel).
+"""
+
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from column_parallel import COLUMN_EXECUTOR
+from data_versions import column_version
+
+QUANTILES = [0.25, 0.5, 0.75]
+
+PATTERNS = {
+    "email": r"[^@\s]+@[^@\s]+\.[A-Za-z]{2,}",
+    "date": r"\d{4}[-/.]\d{1,2}[-/.]\d{1,2}|\d{1,2}[-/.]\d{1,2}[-/.]\d{2,4}",
+    "currency": r"[$€£¥]\s?-?[\d,]+(?:\.\d+)?|-?[\d,]+(?:\.\d+)?\s?(?:usd|eur|gbp|inr)",
+}
+
+def _is_numeric(series):
+    return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+class StatProfiler:
+    def __init__(self, cache_size=256, top_n=3, executor=None):
+        self.cache_size = cache_size
+        self.top_n = top_n
+        self.executor = executor or COLUMN_EXECUTOR
+        self._cache = OrderedDict() # (column, version) -> profile dict
+        self._lock = threading.Lock()
+
+    def profile(self, df, cols=None, compute=None):
+        """
+        Returns {column: profile} for cols (default: all user-facing columns).
+        compute(df, numeric_cols, text_cols) can supply the uncached profiles
+        (the SQL backend does); returning None falls back to pandas.
+        """
+        cols = [c for c in df.columns if not str(c).startswith('_')] if cols is None else list(cols)
+        keys = {col: (col, column_version(df, col)) for col in cols}
+
+        with self._lock:
+            cached = {col: self._cache.get(key) for col, key in keys.items()}
+
+        # Columns whose moments survived an append only need their quartiles
+        missing = [c for c in cols if cached[c] is None]
+        partial = [c for c in cols if cached[c] is not None and cached[c].get("25%") is None and cached[c]["kind"] == "numeric"]
+
+        fresh = {}
+        numeric = [c for c in missing if _is_numeric(df[c])]
+        text = [c for c in missing if c not in numeric]
+        computed = compute(df, numeric, text) if compute and (numeric or text) else None
+        if computed is not None:
+            fresh.update(computed)
+        else:
+            if numeric:
+                fresh.update(self._numeric_block(df[numeric]))
+            fresh.update(zip(text, self.executor.map(self._text_profile, [df[col] for col in text])))
+        if partial:
+            quartiles = df[partial].quantile(QUANTILES)
+            for col in partial:
+                fresh[col] = {**cached[col], **self._quartiles(quartiles[col])}
+
+        with self._lock:
+            for col, prof in fresh.items():
+                self._store(keys[col], prof)
+            for key in keys.values():
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+
+        return {col: fresh.get(col) or cached[col] for col in cols}
+
+    def append(self, df, old_versions, start):
+        """
+        Folds rows df.iloc[start:] into the cached profiles of the frame they
+        were appended to. old_versions is that frame's df.attrs['col_versions'].
+        """
+        tail = df.iloc[start:]
+        updates = {}
+        with self._lock:
+            for col in df.columns:
+                prof = self._cache.get((col, old_versions.get(col)))
+                if prof is not None and prof["kind"] == "numeric" and _is_numeric(df[col]):
+                    updates[col] = prof
+
+        for col, prof in updates.items():
+            merged = self._merge(prof, self._moments(tail[col]))
+            with self._lock:
+                self._store((col, column_version(df, col)), merged)
+
+    def report(self, profiles):
+        """
+        Renders profiles as describe()-style text, numeric and text columns apart.
+        """
+        blocks = []
+        numeric = {c: p for c, p in profiles.items() if p["kind"] == "numeric"}
+        text = {c: p for c, p in profiles.items() if p["kind"] == "text"}
+        if numeric:
+            rows = ["count", "missing", "mean", "std", "min", "25%", "50%", "75%", "max"]
+            table = pd.DataFrame({c: [p.get(r) for r in rows] for c, p in numeric.items()}, index=rows)
+            blocks.append(table.to_string())
+        if text:
+            rows = ["count", "missing", "unique", "top", "freq"]
+            table = pd.DataFrame({c: [p.get(r) for r in rows] for c, p in text.items()}, index=rows)
+            blocks.append(table.to_string())
+        return "\n\n".join(blocks)
+
+    # --- COMPUTATION ---
+    def _numeric_block(self, block):
+        counts = block.count()
+        means = block.mean()
+        variances = block.var()
+        mins = block.min()
+        maxs = block.max()
+        quartiles = block.quantile(QUANTILES)
+
+        profiles = {}
+        for col in block.columns:
+            n = int(counts[col])
+            profiles[col] = {
+                "kind": "numeric",
+                "count": n,
+                "missing": len(block) - n,
+                "mean": means[col],
+                "m2": variances[col] * (n - 1) if n > 1 else 0.0,
+                "min": mins[col],
+                "max": maxs[col],
+                **self._quartiles(quartiles[col]),
+            }
+            profiles[col]["std"] = self._std(profiles[col])
+        return profiles
+
+    def _text_profile(self, series):
+        counts = series.value_counts()
+        n = int(series.count())
+        return {
+            "kind": "text",
+            "count": n,
+            "missing": len(series) - n,
+            "unique": len(counts),
+            "top": counts.index[0] if len(counts) else None,
+            "freq": int(counts.iloc[0]) if len(counts) else 0,
+            "top_values": counts.head(self.top_n).to_dict(),
+        }
+
+    def _moments(self, series):
+        values = pd.to_numeric(series, errors="coerce").dropna()
+        n = len(values)
+        mean = values.mean() if n else np.nan
+        return {
+            "count": n,
+            "missing": len(series) - n,
+            "mean": mean,
+            "m2": float(((values - mean) ** 2).sum()) if n else 0.0,
+            "min": values.min() if n else np.nan,
+            "max": values.max() if n else np.nan,
+        }
+
+    def _merge(self, a, b):
+        """
+        Chan et al. parallel update of count/mean/M2; quartiles are dropped
+        and recomputed on the next profile() call.
+        """
+        n = a["count"] + b["count"]
+        if b["count"] == 0:
+            mean, m2 = a["mean"], a["m2"]
+        elif a["count"] == 0:
+            mean, m2 = b["mean"], b["m2"]
+        else:
+            delta = b["mean"] - a["mean"]
+            mean = a["mean"] + delta * b["count"] / n
+            m2 = a["m2"] + b["m2"] + delta ** 2 * a["count"] * b["count"] / n
+
+        sides = [p for p in (a, b) if p["count"]] or [a]
+        merged = {
+            "kind": "numeric",
+            "count": n,
+            "missing": a["missing"] + b["missing"],
+            "mean": mean,
+            "m2": m2,
+            "min": min(p["min"] for p in sides),
+            "max": max(p["max"] for p in sides),
+        }
+        if b["count"] == 0:
+            # Only empty rows were added: the quartiles still hold
+            merged.update({q: a.get(q) for q in ("25%", "50%", "75%")})
+        merged["std"] = self._std(merged)
+        return merged
+
+    def _quartiles(self, values):
+        return {"25%": values[0.25], "50%": values[0.5], "75%": values[0.75]}
+
+    def _std(self, prof):
+        return np.sqrt(prof["m2"] / (prof["count"] - 1)) if prof["count"] > 1 else np.nan
+
+    def _store(self, key, prof):
+        self._cache[key] = prof
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+def fingerprint_columns(df, cols=None, executor=None):
+    """
+    One vectorized pass per column. Returns {column: fingerprint} with
+    plain floats/dicts only, so it can live in df.attrs and survive spills.
+    """
+    cols = [c for c in df.columns if not str(c).startswith('_')] if cols is None else cols
+    fingerprints = (executor or COLUMN_EXECUTOR).map(_fingerprint, [df[col] for col in cols])
+    return dict(zip(cols, fingerprints))
+
+def _fingerprint(series):
+    present = series.dropna()
+    n = len(present)
+    fp = {
+        "kind": "numeric" if _is_numeric(series) else "text",
+        "fill_rate": n / len(series) if len(series) else 0.0,
+        "unique_ratio": present.nunique() / n if n else 0.0,
+    }
+    if n == 0:
+        return fp
+
+    if fp["kind"] == "numeric":
+        values = present.to_numpy(dtype=np.float64)
+        fp["monotonic"] = bool(present.is_monotonic_increasing or present.is_monotonic_decreasing)
+        fp["integer_share"] = float(np.mean(values == np.round(values)))
+        fp["unit_step_share"] = float(np.mean(np.abs(np.diff(values)) == 1)) if n > 1 else 0.0
+        # Share of values per order of magnitude (0 -> 1-9, 3 -> thousands, ...)
+        magnitude = np.floor(np.log10(np.abs(values[values != 0]))).astype(int) if np.any(values != 0) else np.zeros(0, int)
+        orders, counts = np.unique(np.clip(magnitude, -3, 9), return_counts=True)
+        fp["magnitudes"] = {int(o): float(c / n) for o, c in zip(orders, counts)}
+        fp["median"] = float(np.median(values))
+    else:
+        text = present.astype(str).str.strip()
+        words = text.str.count(r"\S+").clip(upper=3)
+        fp["word_counts"] = {int(k): float(v) for k, v in words.value_counts(normalize=True).items()}
+        fp["patterns"] = {
+            name: float(text.str.fullmatch(pattern, flags=re.IGNORECASE).mean())
+            for name, pattern in PATTERNS.items()
+        }
+        fp["title_case_share"] = float(text.str.istitle().mean())
+    return fp
@@ -0,0 +1,152 @@
+"""
+JEFF v7.0: ROW-HASH INDEX
+-------------------------
+Role: Incremental Duplicate Detection for 'dedupe'
+
+Every row carries a 64-bit hash of its user-facing values in the hidden
+'_row_hash' column, plus a '_row_clean' flag meaning "known to differ
+from every other clean row". Both columns travel with the frame through
+filter, sort, delete and undo, and a subset of distinct rows is still
+distinct, so only rows that were appended or edited since the last
+dedupe ('dirty' rows) have to be checked again.
+
+Subset dedupes ('dedupe by City') keep the same pair per key, in
+'_row_hash:["City"]' / '_row_clean:["City"]', built on first use.
+
+Hashes only pick the candidates: rows whose hash repeats are compared
+by value before they count as duplicates, so a hash collision never
+drops a distinct row.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+HASH_COL = "_row_hash"
+CLEAN_COL = "_row_clean"
+
+def _key_cols(subset=None):
+    """(hash column, clean column) for whole rows (None) or a subset key."""
+    if not subset:
+        return HASH_COL, CLEAN_COL
+    key = json.dumps([str(c) for c in subset])
+    return f"{HASH_COL}:{key}", f"{CLEAN_COL}:{key}"
+
+class RowHashIndex:
+    def _value_cols(self, df):
+        return [c for c in df.columns if not str(c).startswith('_')]
+
+    def _hash(self, frame):
+        return pd.util.hash_pandas_object(frame, index=False).to_numpy(dtype=np.uint64)
+
+    def _source_cols(self, df, subset):
+        return list(subset) if subset else self._value_cols(df)
+
+    def _keys(self, df):
+        """
+        Keys with an index on df: None (whole rows) and subset lists. Subset
+        indexes whose columns are gone (renamed, deleted) are dropped.
+        """
+        keys = []
+        for col in list(df.columns):
+            name = str(col)
+            if name == HASH_COL:
+                keys.append(None)
+            elif name.startswith(HASH_COL + ":"):
+                subset = json.loads(name[len(HASH_COL) + 1:])
+                if all(c in df.columns for c in subset):
+                    keys.append(subset)
+                else:
+                    self._drop(df, subset)
+        return keys
+
+    def _drop(self, df, subset=None):
+        for col in _key_cols(subset):
+            if col in df.columns:
+                del df[col]
+
+    def ensure(self, df, subset=None):
+        """
+        Builds the hash columns for a key if they are missing (first dedupe,
+        or after a column was added/removed and the index was invalidated).
+        """
+        hash_col, clean_col = _key_cols(subset)
+        if hash_col not in df.columns:
+            df[hash_col] = self._hash(df[self._source_cols(df, subset)])
+            df[clean_col] = False
+        return df
+
+    def invalidate(self, df):
+        """
+        The set of columns changed: drop every index, rebuild lazily.
+        """
+        for key in self._keys(df):
+            self._drop(df, key)
+
+    def refresh(self, df, labels):
+        """
+        Rehashes edited rows (by index label) and marks them dirty, for every key.
+        """
+        if len(labels) == 0:
+            return
+        for key in self._keys(df):
+            hash_col, clean_col = _key_cols(key)
+            df.loc[labels, hash_col] = self._hash(df.loc[labels, self._source_cols(df, key)])
+            df.loc[labels, clean_col] = False
+
+    def detach(self, df):
+        """
+        Removes the hash columns before a row append (which would write NaN
+        into them) and returns them for reattach().
+        """
+        saved = {}
+        for key in self._keys(df):
+            hash_col, clean_col = _key_cols(key)
+            saved[json.dumps(key)] = (df[hash_col].to_numpy(), df[clean_col].to_numpy())
+            self._drop(df, key)
+        return saved or None
+
+    def reattach(self, df, saved):
+        """
+        Restores detached hashes and hashes only the newly appended rows.
+        """
+        if saved is None:
+            return
+        for key, (hashes, clean) in saved.items():
+            key = json.loads(key)
+            hash_col, clean_col = _key_cols(key)
+            tail = df.iloc[len(hashes):]
+            df[hash_col] = np.concatenate([hashes, self._hash(tail[self._source_cols(df, key)])])
+            df[clean_col] = np.concatenate([clean, np.zeros(len(tail), dtype=bool)])
+
+    def duplicated(self, df, subset=None):
+        """
+        Boolean mask matching df.duplicated(subset, keep='first').
+        Only dirty rows and the rows sharing their hash are checked.
+        """
+        self.ensure(df, subset)
+        hash_col, clean_col = _key_cols(subset)
+        hashes = df[hash_col]
+        dirty = ~df[clean_col].to_numpy(dtype=bool)
+        mask = np.zeros(len(df), dtype=bool)
+        if dirty.any():
+            # Clean rows are mutually distinct; only hashes seen on dirty rows can repeat
+            candidates = hashes.isin(hashes[dirty].unique()).to_numpy()
+            repeated = hashes[candidates].duplicated(keep=False).to_numpy()
+            rows = np.flatnonzero(candidates)[repeated]
+            if rows.size:
+                # Equal hashes are not proof: compare the values of every row in a repeated-hash group
+                values = df.iloc[rows][self._source_cols(df, subset)]
+                mask[rows] = values.duplicated(keep='first').to_numpy()
+        return pd.Series(mask, index=df.index)
+
+    def mark_clean(self, df, subset=None):
+        """
+        After a dedupe every remaining row is distinct on the key, and
+        rows with distinct keys are distinct whole rows too.
+        """
+        for key in [None] + ([list(subset)] if subset else []):
+            clean_col = _key_cols(key)[1]
+            if clean_col in df.columns:
+                df[clean_col] = True
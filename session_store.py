@@ -0,0 +1,212 @@
+"""
+JEFF v6.2: SESSION STORE (SPILL ENGINE)
+---------------------------------------
+Role: Undo Snapshots & Idle Session Spilling
+
+This module owns the active DataFrame and the undo history of one
+analysis session. Only the most recent snapshots stay in RAM; older
+ones (and the active frame of sessions that have gone idle) are
+spilled to Arrow IPC files in a private temp directory and reloaded
+through memory mapping when they are needed again.
+"""
+
+import os
+import json
+import time
+import shutil
+import logging
+import tempfile
+import threading
+import weakref
+
+import pandas as pd
+
+ATTRS_KEY = b"jeff_attrs"
+
+
+def write_arrow(df, path):
+    """
+    Writes a DataFrame (index and df.attrs included) to an Arrow IPC file.
+    """
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    metadata = dict(table.schema.metadata or {})
+    metadata[ATTRS_KEY] = json.dumps(df.attrs, default=str).encode("utf-8")
+    table = table.replace_schema_metadata(metadata)
+
+    with pa.OSFile(path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    return path
+
+
+def read_arrow(path):
+    """
+    Reloads a DataFrame written by write_arrow through a memory map.
+    """
+    import pyarrow as pa
+
+    with pa.memory_map(path, "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    df = table.to_pandas()
+
+    # Arrow hands list cells back as numpy arrays; keep Phase 2 lists as lists
+    for field in table.schema:
+        if pa.types.is_list(field.type) and field.name in df.columns:
+            df[field.name] = pd.Series(table.column(field.name).to_pylist(), index=df.index, dtype=object)
+
+    raw_attrs = (table.schema.metadata or {}).get(ATTRS_KEY)
+    if raw_attrs:
+        df.attrs.update(json.loads(raw_attrs.decode("utf-8")))
+    return df
+
+
+def _discard(path):
+    if not path:
+        return
+    try:
+        os.remove(path)
+    except OSError:
+        # Still mapped (Windows) or already gone; the temp dir cleanup handles it.
+        pass
+
+
+class SessionStore:
+    def __init__(self, hot_snapshots=2, spill_dir=None):
+        # Number of undo snapshots kept in RAM before older ones are spilled
+        self.hot_snapshots = hot_snapshots
+        self.spill_dir = tempfile.mkdtemp(prefix="jeff_session_", dir=spill_dir)
+
+        self.undo_stack = []   # Entries are DataFrames (hot) or file paths (spilled)
+        self.version = 0       # Bumped every time the active frame is replaced
+        self.last_touch = time.time()
+
+        self._df = None
+        self._df_path = None
+        self._file_seq = 0
+        self._lock = threading.RLock()
+
+        # Remove spill files when the session object is garbage collected
+        weakref.finalize(self, shutil.rmtree, self.spill_dir, True)
+
+    # --- ACTIVE FRAME ---
+    @property
+    def df(self):
+        """
+        The active DataFrame. Resumes it from disk if it was spilled while idle.
+        """
+        with self._lock:
+            self.touch()
+            if self._df is None and self._df_path:
+                self._df = read_arrow(self._df_path)
+                _discard(self._df_path)
+                self._df_path = None
+                logging.info("Session Store: Resumed active frame from spill file.")
+            return self._df
+
+    @df.setter
+    def df(self, value):
+        with self._lock:
+            self.touch()
+            _discard(self._df_path)
+            self._df_path = None
+            self._df = value
+            self.version += 1
+
+    @property
+    def has_data(self):
+        return self._df is not None or self._df_path is not None
+
+    @property
+    def idle_seconds(self):
+        return time.time() - self.last_touch
+
+    def touch(self):
+        self.last_touch = time.time()
+
+    def spill_active(self):
+        """
+        Moves the active frame out of RAM. Returns True if it was spilled.
+        """
+        with self._lock:
+            if not isinstance(self._df, pd.DataFrame):
+                return False # Nothing loaded, or an out-of-core frame that already lives on disk
+            path = self._spill(self._df)
+            if path is None:
+                return False
+            self._df = None
+            self._df_path = path
+            return True
+
+    # --- UNDO HISTORY ---
+    def push_undo(self, df):
+        with self._lock:
+            self.undo_stack.append(df)
+            hot = [i for i, s in enumerate(self.undo_stack) if isinstance(s, pd.DataFrame)]
+            for i in hot[:max(len(hot) - self.hot_snapshots, 0)]:
+                path = self._spill(self.undo_stack[i])
+                if path is not None:
+                    self.undo_stack[i] = path
+
+    def pop_undo(self):
+        with self._lock:
+            if not self.undo_stack:
+                return None
+            snapshot = self.undo_stack.pop()
+            if isinstance(snapshot, str):
+                path = snapshot
+                snapshot = read_arrow(path)
+                _discard(path)
+            return snapshot
+
+    def clear_undo(self):
+        with self._lock:
+            for snapshot in self.undo_stack:
+                if isinstance(snapshot, str):
+                    _discard(snapshot)
+            self.undo_stack = []
+
+    def __len__(self):
+        return len(self.undo_stack)
+
+    # --- INTERNALS ---
+    def _spill(self, df):
+        import pyarrow as pa
+
+        self._file_seq += 1
+        path = os.path.join(self.spill_dir, f"frame_{self._file_seq}.arrow")
+        try:
+            return write_arrow(df, path)
+        except (pa.ArrowException, TypeError, ValueError) as e:
+            # Mixed-type object columns cannot be expressed in Arrow; keep them in RAM.
+            logging.warning(f"Session Store: Spill skipped ({e}).")
+            _discard(path)
+            return None
+
+
+class SessionVault:
+    """
+    Process-wide registry of live sessions. Any rerun can sweep it so that
+    sessions nobody has touched for a while release their active frame.
+    """
+    def __init__(self, idle_after=600):
+        self.idle_after = idle_after
+        self._stores = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    def register(self, store):
+        with self._lock:
+            self._stores.add(store)
+        return store
+
+    def sweep(self):
+        with self._lock:
+            stores = list(self._stores)
+        spilled = 0
+        for store in stores:
+            if store.idle_seconds > self.idle_after and store.spill_active():
+                spilled += 1
+        if spilled:
+            logging.info(f"Session Vault: Spilled {spilled} idle session(s) to disk.")
+        return spilled
@@ -0,0 +1,305 @@
+"""
+JEFF v6.8: APPROXIMATE STATISTICS (SKETCHES)
+--------------------------------------------
+Role: Bounded-Memory Summaries for Multi-Million-Row Frames
+
+Each column gets a mergeable sketch bundle, built chunk-by-chunk:
+  - HyperLogLog for distinct counts     (relative error ~1.04/sqrt(2^p))
+  - KLL-style compactor for quantiles   (rank error ~3.3/k)
+  - Misra-Gries / Space-Saving top-k    (count error <= n/(capacity+1))
+plus exact count, missing, sum, min and max. Sketches from different
+chunks merge without rescanning, and every estimate is reported with
+its error bound. Columns are sketched in parallel on the shared
+ColumnExecutor (see column_parallel).
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from column_parallel import COLUMN_EXECUTOR
+from data_versions import column_version
+
+def _nan_min(a, b):
+    return b if np.isnan(a) else a if np.isnan(b) else min(a, b)
+
+def _nan_max(a, b):
+    return b if np.isnan(a) else a if np.isnan(b) else max(a, b)
+
+class HyperLogLog:
+    def __init__(self, p=14):
+        self.p = p
+        self.m = 1 << p
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def add_hashes(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if hashes.size == 0:
+            return
+        idx = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        rest = hashes & np.uint64((1 << (64 - self.p)) - 1)
+        # Position of the first 1-bit in the remaining 64-p bits
+        _, exponent = np.frexp(rest.astype(np.float64))
+        rank = np.where(rest == 0, 64 - self.p + 1, 64 - self.p - exponent + 1).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rank)
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self):
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        raw = alpha * self.m ** 2 / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = np.count_nonzero(self.registers == 0)
+        if raw <= 2.5 * self.m and zeros:
+            return self.m * np.log(self.m / zeros) # Linear counting for small cardinalities
+        return raw
+
+    @property
+    def relative_error(self):
+        return 1.04 / np.sqrt(self.m)
+
+class QuantileSketch:
+    """
+    KLL-style compactor hierarchy: level h holds items of weight 2^h.
+    A full level is sorted and every other item (random offset) moves up.
+    """
+    def __init__(self, k=200, seed=0):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.n = 0
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        self.n += values.size
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            if self.levels[h].size > self.k:
+                items = np.sort(self.levels[h])
+                keep_odd = items.size % 2 # An odd leftover stays on this level
+                leftover, items = items[:keep_odd], items[keep_odd:]
+                promoted = items[self._rng.integers(2)::2]
+                self.levels[h] = leftover
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h += 1
+
+    def weighted_items(self):
+        items = np.concatenate(self.levels) if self.levels else np.empty(0)
+        weights = np.concatenate([np.full(l.size, 2.0 ** h) for h, l in enumerate(self.levels)])
+        return items, weights
+
+    def quantile(self, q):
+        items, weights = self.weighted_items()
+        if items.size == 0:
+            return np.nan
+        order = np.argsort(items)
+        cum = np.cumsum(weights[order])
+        pos = np.searchsorted(cum, q * cum[-1], side="left")
+        return items[order][min(pos, items.size - 1)]
+
+    @property
+    def rank_error(self):
+        return 3.3 / self.k
+
+class TopK:
+    """
+    Mergeable Misra-Gries summary. Reported counts are lower bounds that
+    are off by at most n / (capacity + 1).
+    """
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype=np.int64)
+        self.n = 0
+
+    def update(self, series):
+        chunk = series.dropna().value_counts()
+        self.n += int(chunk.sum())
+        self._absorb(chunk)
+
+    def merge(self, other):
+        self.n += other.n
+        self._absorb(other.counts)
+        return self
+
+    def _absorb(self, chunk):
+        combined = self.counts.add(chunk, fill_value=0).sort_values(ascending=False)
+        if len(combined) > self.capacity:
+            cut = combined.iloc[self.capacity]
+            combined = combined.iloc[:self.capacity] - cut
+            combined = combined[combined > 0]
+        self.counts = combined.astype(np.int64)
+
+    def top(self, n=10):
+        return self.counts.head(n)
+
+    @property
+    def max_error(self):
+        return self.n // (self.capacity + 1)
+
+class ColumnSketch:
+    def __init__(self, numeric):
+        self.numeric = numeric
+        self.count = 0
+        self.missing = 0
+        self.total = 0.0
+        self.min = np.nan
+        self.max = np.nan
+        self.hll = HyperLogLog()
+        self.quantiles = QuantileSketch() if numeric else None
+        self.topk = None if numeric else TopK()
+
+    def update(self, series):
+        present = series.dropna()
+        self.count += len(present)
+        self.missing += len(series) - len(present)
+        self.hll.add_hashes(pd.util.hash_pandas_object(present, index=False).to_numpy())
+
+        if self.numeric:
+            values = pd.to_numeric(present, errors="coerce").to_numpy(dtype=np.float64)
+            if values.size:
+                self.total += float(np.nansum(values))
+                self.min = _nan_min(self.min, float(np.nanmin(values)))
+                self.max = _nan_max(self.max, float(np.nanmax(values)))
+            self.quantiles.update(values)
+        else:
+            self.topk.update(present)
+        return self
+
+    def merge(self, other):
+        self.count += other.count
+        self.missing += other.missing
+        self.total += other.total
+        self.min = _nan_min(self.min, other.min)
+        self.max = _nan_max(self.max, other.max)
+        self.hll.merge(other.hll)
+        if self.numeric:
+            self.quantiles.merge(other.quantiles)
+        else:
+            self.topk.merge(other.topk)
+        return self
+
+    def summary(self):
+        out = {
+            "count": self.count,
+            "missing": self.missing,
+            "distinct~": round(self.hll.estimate()),
+            "distinct ±": f"{self.hll.relative_error:.1%}",
+        }
+        if self.numeric:
+            out.update({
+                "mean": self.total / self.count if self.count else np.nan,
+                "min": self.min,
+                "25%~": self.quantiles.quantile(0.25),
+                "50%~": self.quantiles.quantile(0.5),
+                "75%~": self.quantiles.quantile(0.75),
+                "max": self.max,
+                "rank ±": f"{self.quantiles.rank_error:.1%}",
+            })
+        else:
+            top = self.topk.top(1)
+            out.update({
+                "top~": top.index[0] if len(top) else None,
+                "freq~": int(top.iloc[0]) if len(top) else 0,
+                "freq ±": self.topk.max_error,
+            })
+        return out
+
+def _is_numeric(series):
+    return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+class SketchAccumulator:
+    """
+    Merges per-chunk sketches for a set of columns as chunks stream past.
+    Numeric-ness is decided by the first chunk so every part merges.
+    """
+    def __init__(self, cols, executor=None):
+        self.cols = list(cols)
+        self.sketches = {}
+        self.executor = executor or COLUMN_EXECUTOR
+
+    def update(self, chunk):
+        def fold(col):
+            merged = self.sketches.get(col)
+            part = ColumnSketch(_is_numeric(chunk[col]) if merged is None else merged.numeric).update(chunk[col])
+            return part if merged is None else merged.merge(part)
+
+        # Each column's sketch only ever sees its own column
+        self.sketches.update(zip(self.cols, self.executor.map(fold, self.cols)))
+        return self
+
+def build_sketches(df, cols=None, chunk_rows=250000, executor=None):
+    """
+    Builds one ColumnSketch per column, chunk by chunk, merging as it goes.
+    Works on a ChunkedFrame too, one row group at a time.
+    """
+    cols = [c for c in df.columns if not str(c).startswith('_')] if cols is None else cols
+    acc = SketchAccumulator(cols, executor)
+    if hasattr(df, "iter_chunks"):
+        chunks = df.iter_chunks(cols)
+    else:
+        chunks = (df[cols].iloc[start:start + chunk_rows] for start in range(0, max(len(df), 1), chunk_rows))
+    for chunk in chunks:
+        acc.update(chunk)
+    return acc.sketches
+
+def sketch_report(sketches):
+    """
+    Renders sketch summaries as text; '~' marks estimates, '±' their bounds.
+    """
+    blocks = []
+    for numeric in (True, False):
+        group = {c: s.summary() for c, s in sketches.items() if s.numeric == numeric}
+        if group:
+            blocks.append(pd.DataFrame(group).to_string())
+    return "APPROXIMATE (sketch) statistics\n" + "\n\n".join(blocks)
+
+class SketchBook:
+    """
+    Process-wide store of column sketches keyed by (column, version token).
+    """
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._book = OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(self, df, sketches):
+        with self._lock:
+            for col, sketch in sketches.items():
+                self._book[(col, column_version(df, col))] = sketch
+            while len(self._book) > self.max_entries:
+                self._book.popitem(last=False)
+
+    def get(self, df, cols):
+        """
+        Returns sketches for cols, building (and registering) any that are missing.
+        """
+        keys = {col: (col, column_version(df, col)) for col in cols}
+        with self._lock:
+            found = {col: self._book.get(key) for col, key in keys.items()}
+        missing = [col for col, s in found.items() if s is None]
+        if missing:
+            built = build_sketches(df, missing)
+            self.register(df, built)
+            found.update(built)
+        return found
+
+SKETCH_BOOK = SketchBook()
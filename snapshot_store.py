@@ -0,0 +1,209 @@
+"""
+JEFF v7.8: SESSION SNAPSHOTS
+----------------------------
+Role: Resume an Analysis Without Re-Pasting or Re-Ingesting
+
+SchemaLockMaster(snapshot_dir=...) writes the locked frame once per
+lock; every app session that works on it keeps a journal of committed
+commands next to it:
+
+    <root>/<snapshot_id>/
+        data.arrow                       locked frame (Arrow IPC, attrs in metadata)
+        manifest.json                    id, lock time, schema, rows, columns
+        sessions/<journal_id>/
+            journal.jsonl                one committed command per line (text + intent)
+            artifacts/003_plot_Age.png   analysis text / plot PNG bytes
+
+Resuming maps data.arrow back in (phases 2-9 are skipped) and replays
+the journaled intents; analyze/plot are not re-run, their artifacts are
+read back from disk. One journal entry per undo step, so undo keeps
+working after a resume.
+
+<root> is $JEFF_SNAPSHOT_DIR, or jeff_snapshots in the temp directory.
+Each new lock prunes the oldest snapshots (by last use), but never one
+that a journal in this process still has open.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+import weakref
+from collections import Counter
+
+from session_store import read_arrow, write_arrow
+
+READ_ONLY_ACTIONS = ('analyze', 'plot')
+
+# Snapshot directories with an open SessionJournal -> number of journals
+_IN_USE = Counter()
+_IN_USE_LOCK = threading.Lock()
+
+def _retain(path):
+    with _IN_USE_LOCK:
+        _IN_USE[path] += 1
+
+def _release(path):
+    with _IN_USE_LOCK:
+        _IN_USE[path] -= 1
+        if _IN_USE[path] <= 0:
+            del _IN_USE[path]
+
+def snapshot_root():
+    return os.environ.get("JEFF_SNAPSHOT_DIR") or os.path.join(tempfile.gettempdir(), "jeff_snapshots")
+
+def _snapshot_dir(snapshot_id, root=None):
+    # Ids come back from URLs; never let one point outside the root
+    if not snapshot_id or os.path.basename(snapshot_id) != snapshot_id or snapshot_id.startswith('.'):
+        raise ValueError(f"Invalid snapshot id '{snapshot_id}'.")
+    return os.path.join(root or snapshot_root(), snapshot_id)
+
+def write_snapshot(df, root=None, keep=20):
+    """
+    Writes df (locked, with attrs['session_id']) as a snapshot and prunes
+    all but the `keep` newest ones. Returns the snapshot directory.
+    """
+    root = root or snapshot_root()
+    path = _snapshot_dir(df.attrs["session_id"], root)
+    os.makedirs(path, exist_ok=True)
+    try:
+        write_arrow(df, os.path.join(path, "data.arrow"))
+    except Exception:
+        shutil.rmtree(path, ignore_errors=True) # No half-written snapshots
+        raise
+
+    manifest = {
+        "snapshot_id": df.attrs["session_id"],
+        "lock_time": df.attrs.get("lock_time"),
+        "final_schema": df.attrs.get("final_schema"),
+        "rows": len(df),
+        "columns": [str(c) for c in df.columns if not str(c).startswith('_')],
+        "written": time.time(),
+    }
+    with open(os.path.join(path, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, default=str)
+
+    _prune(root, keep)
+    return path
+
+def _prune(root, keep):
+    snapshots = sorted(
+        (os.path.abspath(os.path.join(root, name)) for name in os.listdir(root)),
+        key=lambda p: os.path.getmtime(p) if os.path.isdir(p) else 0,
+        reverse=True,
+    )
+    with _IN_USE_LOCK:
+        in_use = set(_IN_USE)
+    for old in snapshots[keep:]:
+        if old not in in_use: # A live session still journals under it
+            shutil.rmtree(old, ignore_errors=True)
+
+def ensure_snapshot(df, root=None):
+    """
+    Makes sure df's snapshot is on disk, re-writing it if it was pruned
+    (a frame shared through FrameCache can outlive its snapshot). Returns
+    the snapshot id, or None if df has none.
+    """
+    snapshot_id = df.attrs.get("snapshot_id")
+    if snapshot_id and not os.path.exists(os.path.join(_snapshot_dir(snapshot_id, root), "data.arrow")):
+        write_snapshot(df, root)
+    return snapshot_id
+
+def load_snapshot(snapshot_id, root=None):
+    """The locked frame of a snapshot, read through a memory map."""
+    return read_arrow(os.path.join(_snapshot_dir(snapshot_id, root), "data.arrow"))
+
+class SessionJournal:
+    """
+    Committed commands of one session on top of a snapshot. token
+    ('<snapshot_id>.<journal_id>') is what the app puts in the URL.
+    While the journal object lives, its snapshot is never pruned.
+    """
+    def __init__(self, snapshot_id, journal_id=None, root=None):
+        self.snapshot_id = snapshot_id
+        self.journal_id = journal_id or uuid.uuid4().hex[:12]
+        self.snapshot_path = os.path.abspath(_snapshot_dir(snapshot_id, root))
+        if not os.path.exists(os.path.join(self.snapshot_path, "data.arrow")):
+            # Never recreate a pruned snapshot as an empty folder a token would point at
+            raise FileNotFoundError(f"Snapshot '{snapshot_id}' no longer exists.")
+        self.path = os.path.join(self.snapshot_path, "sessions", self.journal_id)
+        self.artifact_dir = os.path.join(self.path, "artifacts")
+        os.makedirs(self.artifact_dir, exist_ok=True)
+        self._log = os.path.join(self.path, "journal.jsonl")
+        _retain(self.snapshot_path)
+        weakref.finalize(self, _release, self.snapshot_path)
+        os.utime(self.snapshot_path) # Opened (or resumed) counts as a use
+
+    @property
+    def token(self):
+        return f"{self.snapshot_id}.{self.journal_id}"
+
+    @classmethod
+    def open(cls, token, root=None):
+        snapshot_id, _, journal_id = token.rpartition(".")
+        if not os.path.isdir(os.path.join(_snapshot_dir(snapshot_id, root), "sessions", os.path.basename(journal_id))):
+            raise FileNotFoundError(f"No saved session '{token}'.")
+        return cls(snapshot_id, os.path.basename(journal_id), root)
+
+    def entries(self):
+        if not os.path.exists(self._log):
+            return []
+        with open(self._log, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def record(self, command, intent, msg, artifact=None):
+        """Appends one committed command (and writes its artifact, if any)."""
+        entry = {"command": command, "intent": intent, "msg": msg, "artifact": None}
+        if artifact:
+            name = f"{len(self.entries()):03d}_{os.path.basename(artifact['filename'])}"
+            content = artifact['content']
+            mode = 'wb' if isinstance(content, (bytes, bytearray)) else 'w'
+            with open(os.path.join(self.artifact_dir, name), mode) as f:
+                f.write(content)
+            entry["artifact"] = {"type": artifact['type'], "filename": artifact['filename'], "file": name}
+        with open(self._log, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, default=str) + "\n")
+        os.utime(self.snapshot_path) # Snapshots in use are pruned last
+
+    def pop(self):
+        """Drops the last entry (undo)."""
+        entries = self.entries()
+        if not entries:
+            return None
+        last = entries.pop()
+        with open(self._log, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(e, default=str) + "\n" for e in entries)
+        if last["artifact"]:
+            try: os.remove(os.path.join(self.artifact_dir, last["artifact"]["file"]))
+            except OSError: pass
+        return last
+
+    def read_artifact(self, ref):
+        mode = 'rb' if ref["type"] == 'plot' else 'r'
+        with open(os.path.join(self.artifact_dir, ref["file"]), mode) as f:
+            return {"type": ref["type"], "filename": ref["filename"], "content": f.read()}
+
+def resume_session(token, action_suite, store, root=None):
+    """
+    Loads the snapshot into store and replays the journal, pushing one
+    undo step per entry. Returns (journal, artifacts in order).
+    """
+    journal = SessionJournal.open(token, root)
+    store.clear_undo()
+    store.df = load_snapshot(journal.snapshot_id, root)
+
+    artifacts = []
+    for entry in journal.entries():
+        df = store.df
+        if entry["intent"]["action"] not in READ_ONLY_ACTIONS:
+            df, msg, _ = action_suite.execute(entry["intent"], df.copy())
+            if msg.startswith("Error:"):
+                raise RuntimeError(f"Replay of '{entry['command']}' failed: {msg}")
+        store.push_undo(store.df)
+        store.df = df
+        if entry["artifact"]:
+            artifacts.append(journal.read_artifact(entry["artifact"]))
+    return journal, artifacts
@@ -0,0 +1,260 @@
+"""
+JEFF v7.7: SQL BACKEND (DUCKDB)
+-------------------------------
+Role: Multi-Threaded, Vectorized Execution of filter/sort/group/dedupe/analyze
+
+Optional: needs the duckdb package (no server, runs in-process). The
+active frame's user-facing columns plus a row-position column are
+registered with an embedded DuckDB connection as an Arrow table (no
+copy for Arrow-backed text and numeric columns), and the action becomes
+one SQL query that runs on all cores.
+
+filter, sort and dedupe only ask SQL for row positions; the frame itself
+is then taken with one iloc, so hidden columns, dtypes and the index are
+exactly what the pandas path would produce. group and analyze return
+their (small) results directly.
+
+Semantics follow the pandas path: missing values never match a
+predicate except '!=', text predicates are case-insensitive, sorts are
+stable with missing values last, group keys include missing values and
+dedupe keeps the first occurrence. Anything that cannot be expressed
+(datetime predicates, engine errors on odd object columns) raises
+SqlFallback and the suite runs pandas instead.
+
+benchmark_suite.py parity checks both backends against each other.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from filter_expr import _text
+
+ROW_COL = "__jeff_row"
+
+class SqlFallback(Exception):
+    """The SQL backend cannot run this action; use pandas."""
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+def _is_numeric(series):
+    return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+class DuckDBBackend:
+    name = "duckdb"
+
+    def __init__(self, threads=None):
+        import duckdb # ImportError tells make_backend() to stay on pandas
+
+        self._duckdb = duckdb
+        self._con = duckdb.connect(config={"threads": threads} if threads else {})
+        self._lock = threading.Lock()
+
+    # --- QUERY PLUMBING ---
+    def _query(self, df, sql, params=(), cols=None):
+        """
+        Runs sql against df registered as 'frame' (cols + ROW_COL) and
+        returns the result as a DataFrame.
+        """
+        import pyarrow as pa
+
+        cols = [c for c in df.columns if not str(c).startswith('_')] if cols is None else list(cols)
+        view = df[cols].assign(**{ROW_COL: np.arange(len(df), dtype=np.int64)})
+        try:
+            # Arrow-backed text and numeric columns convert without copying;
+            # DuckDB scans an Arrow table far faster than a pandas frame
+            view = pa.Table.from_pandas(view, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            pass # Mixed-type object columns: let DuckDB's pandas scan stringify them
+        with self._lock:
+            cursor = self._con.cursor() # One connection per call, so worker threads don't share state
+        try:
+            cursor.register("frame", view)
+            return cursor.execute(sql, list(params)).df()
+        except self._duckdb.Error as e:
+            raise SqlFallback(str(e)) from e
+        finally:
+            cursor.close()
+
+    def _positions(self, df, sql, params=(), cols=None):
+        return self._query(df, sql, params, cols)[ROW_COL].to_numpy(dtype=np.int64)
+
+    # --- FILTER ---
+    def filter_rows(self, df, tree):
+        """Row positions matching a filter_expr tree, in frame order."""
+        params = []
+        where = self._predicate(df, tree, params)
+        return self._positions(df, f"SELECT {ROW_COL} FROM frame WHERE {where} ORDER BY {ROW_COL}", params)
+
+    def _predicate(self, df, node, params):
+        op = node['op']
+        if op in ('and', 'or'):
+            return "(" + f" {op.upper()} ".join(self._predicate(df, a, params) for a in node['args']) + ")"
+        if op == 'not':
+            return f"(NOT {self._predicate(df, node['arg'], params)})"
+
+        col = node['column']
+        series = df[col]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            raise SqlFallback("datetime predicates")
+        if _is_numeric(series) and op in ('cmp', 'between', 'in'):
+            return self._numeric_leaf(col, node, params)
+        return self._text_leaf(col, node, params)
+
+    def _number(self, col, value):
+        if isinstance(value, float):
+            return value
+        try: return float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Column '{col}' is numeric; '{value}' is not a number.")
+
+    def _numeric_leaf(self, col, node, params):
+        q = _quote(col)
+        if node['op'] == 'between':
+            params += [self._number(col, node['low']), self._number(col, node['high'])]
+            return f"COALESCE({q} BETWEEN ? AND ?, FALSE)"
+        if node['op'] == 'in':
+            values = [self._number(col, v) for v in node['values']]
+            params += values
+            return f"COALESCE({q} IN ({', '.join('?' * len(values))}), FALSE)"
+        params.append(self._number(col, node['value']))
+        if node['cmp'] == '!=':
+            return f"COALESCE({q} <> ?, TRUE)" # NaN != x is True in pandas
+        return f"COALESCE({q} {'=' if node['cmp'] == '==' else node['cmp']} ?, FALSE)"
+
+    def _text_leaf(self, col, node, params):
+        # Same view as filter_expr: the cell text, lower-cased
+        text = f"lower(CAST({_quote(col)} AS VARCHAR))"
+        op = node['op']
+        if op in ('contains', 'startswith', 'endswith'):
+            params.append(_text(node['value']))
+            fn = {'contains': 'contains', 'startswith': 'starts_with', 'endswith': 'suffix'}[op]
+            return f"COALESCE({fn}({text}, ?), FALSE)"
+        if op == 'in':
+            values = [_text(v) for v in node['values']]
+            params += values
+            return f"COALESCE({text} IN ({', '.join('?' * len(values))}), FALSE)"
+        if op == 'between':
+            params += [_text(node['low']), _text(node['high'])]
+            return f"COALESCE({text} BETWEEN ? AND ?, FALSE)"
+        params.append(_text(node['value']))
+        if node['cmp'] == '!=':
+            return f"(NOT COALESCE({text} = ?, FALSE))"
+        return f"COALESCE({text} {'=' if node['cmp'] == '==' else node['cmp']} ?, FALSE)"
+
+    # --- SORT / DEDUPE ---
+    def sort_rows(self, df, col, ascending=True):
+        """Row positions in stable sort order, missing values last."""
+        direction = "ASC" if ascending else "DESC"
+        return self._positions(
+            df, f"SELECT {ROW_COL} FROM frame ORDER BY {_quote(col)} {direction} NULLS LAST, {ROW_COL}", cols=[col])
+
+    def first_rows(self, df, subset=None):
+        """Positions of the first occurrence of every distinct row (or subset key)."""
+        cols = list(subset) if subset else [c for c in df.columns if not str(c).startswith('_')]
+        keys = ", ".join(_quote(c) for c in cols)
+        return self._positions(
+            df, f"SELECT min({ROW_COL}) AS {ROW_COL} FROM frame GROUP BY {keys} ORDER BY 1", cols=cols)
+
+    # --- GROUP ---
+    def group(self, df, by, agg="count", value=None):
+        """
+        Same table as group_finish(group_partial(...)): by columns (sorted,
+        missing last) plus one aggregate named like the pandas path.
+        """
+        keys = [_quote(b) for b in by]
+        if value is None:
+            name, expr = agg, "count(*)"
+        else:
+            name = f"{value}_{agg}"
+            if _is_numeric(df[value]):
+                x = f"CAST({_quote(value)} AS DOUBLE)"
+            else:
+                x = f"TRY_CAST(trim(CAST({_quote(value)} AS VARCHAR)) AS DOUBLE)" # pd.to_numeric(errors='coerce')
+            expr = {
+                "count": f"count({x})",
+                "sum": f"COALESCE(sum({x}), 0)",
+                "mean": f"avg({x})",
+                "min": f"min({x})",
+                "max": f"max({x})",
+            }[agg]
+        order = ", ".join(f"{k} ASC NULLS LAST" for k in keys)
+        cols = list(dict.fromkeys(list(by) + ([value] if value else [])))
+        out = self._query(
+            df, f"SELECT {', '.join(keys)}, {expr} AS {_quote(name)} FROM frame GROUP BY {', '.join(keys)} ORDER BY {order}",
+            cols=cols)
+        out.columns = list(by) + [name]
+        if agg == "count" or value is None:
+            out[name] = out[name].astype(np.int64)
+        return out
+
+    # --- ANALYZE ---
+    def profile_columns(self, df, numeric, text, top_n=3):
+        """
+        StatProfiler-compatible profiles: one query for every numeric
+        column, one small GROUP BY per text column.
+        """
+        profiles = {}
+        n_rows = len(df)
+        if numeric:
+            parts = []
+            for i, col in enumerate(numeric):
+                q = f"CAST({_quote(col)} AS DOUBLE)"
+                parts += [f"count({q}) AS c{i}", f"avg({q}) AS mean{i}", f"var_samp({q}) AS var{i}",
+                          f"min({q}) AS min{i}", f"max({q}) AS max{i}",
+                          f"quantile_cont({q}, [0.25, 0.5, 0.75]) AS q{i}"]
+            row = self._query(df, f"SELECT {', '.join(parts)} FROM frame", cols=numeric).iloc[0]
+            for i, col in enumerate(numeric):
+                n = int(row[f"c{i}"])
+                quartiles = row[f"q{i}"] if n else None
+                prof = {
+                    "kind": "numeric",
+                    "count": n,
+                    "missing": n_rows - n,
+                    "mean": _float(row[f"mean{i}"]),
+                    "m2": _float(row[f"var{i}"]) * (n - 1) if n > 1 else 0.0,
+                    "min": _float(row[f"min{i}"]),
+                    "max": _float(row[f"max{i}"]),
+                    "25%": quartiles[0] if quartiles is not None else np.nan,
+                    "50%": quartiles[1] if quartiles is not None else np.nan,
+                    "75%": quartiles[2] if quartiles is not None else np.nan,
+                }
+                prof["std"] = np.sqrt(prof["m2"] / (n - 1)) if n > 1 else np.nan
+                profiles[col] = prof
+        for col in text:
+            q = _quote(col)
+            counts = self._query(
+                df, f"SELECT {q} AS value, count(*) AS freq, count(*) OVER () AS uniq, sum(count(*)) OVER () AS total "
+                    f"FROM frame WHERE {q} IS NOT NULL GROUP BY {q} ORDER BY freq DESC, min({ROW_COL}) LIMIT {int(top_n)}",
+                cols=[col])
+            n = int(counts["total"].iloc[0]) if len(counts) else 0
+            profiles[col] = {
+                "kind": "text",
+                "count": n,
+                "missing": n_rows - n,
+                "unique": int(counts["uniq"].iloc[0]) if len(counts) else 0,
+                "top": counts["value"].iloc[0] if len(counts) else None,
+                "freq": int(counts["freq"].iloc[0]) if len(counts) else 0,
+                "top_values": dict(zip(counts["value"], counts["freq"].astype(int))),
+            }
+        return profiles
+
+def _float(value):
+    return np.nan if value is None or pd.isna(value) else float(value)
+
+def make_backend(name="pandas", threads=None):
+    """
+    'duckdb' -> DuckDBBackend, or None (pandas) if duckdb is not installed.
+    'pandas' or None -> None.
+    """
+    if name in (None, "pandas"):
+        return None
+    if name != "duckdb":
+        raise ValueError(f"Unknown backend '{name}'. Use 'pandas' or 'duckdb'.")
+    try:
+        return DuckDBBackend(threads)
+    except ImportError:
+        print("⚠️ Jeff: duckdb is not installed; actions run on pandas.")
+        return None